@@ -0,0 +1,32 @@
+"""add is_live generated column to books
+
+Revision ID: 4b7e1c9a2d58
+Revises: 9d4f2a6b8c31
+Create Date: 2026-10-18 14:32:51.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1c9a2d58'
+down_revision: Union[str, Sequence[str], None] = '9d4f2a6b8c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('is_live', sa.Boolean(), sa.Computed('deleted_at IS NULL', ), nullable=True))
+    op.create_index('ix_books_is_live_id', 'books', ['is_live', 'id'], unique=False, sqlite_where=sa.text('is_live = 1'), postgresql_where=sa.text('is_live'))
+    op.create_index(op.f('ix_books_deleted_at'), 'books', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_books_deleted_at'), table_name='books')
+    op.drop_index('ix_books_is_live_id', table_name='books', sqlite_where=sa.text('is_live = 1'), postgresql_where=sa.text('is_live'))
+    op.drop_column('books', 'is_live')
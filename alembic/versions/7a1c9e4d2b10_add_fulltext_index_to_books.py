@@ -0,0 +1,39 @@
+"""add fulltext index to books
+
+Revision ID: 7a1c9e4d2b10
+Revises: 5fdce4b019b3
+Create Date: 2026-10-18 09:12:04.511203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c9e4d2b10'
+down_revision: Union[str, Sequence[str], None] = '5fdce4b019b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FULLTEXT hanya untuk MySQL, dialect lain memakai trigram index in-process
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index(
+        'ix_books_title_author_fulltext',
+        'books',
+        ['title', 'author'],
+        unique=False,
+        mysql_prefix='FULLTEXT',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ix_books_title_author_fulltext', table_name='books')
@@ -0,0 +1,33 @@
+"""create permission versions table
+
+Revision ID: a3f5c8e1b7d4
+Revises: 4b7e1c9a2d58
+Create Date: 2026-10-18 16:02:47.513920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f5c8e1b7d4'
+down_revision: Union[str, Sequence[str], None] = '4b7e1c9a2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    permission_versions = op.create_table('permission_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(permission_versions, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('permission_versions')
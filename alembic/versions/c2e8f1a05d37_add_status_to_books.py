@@ -0,0 +1,28 @@
+"""add status to books
+
+Revision ID: c2e8f1a05d37
+Revises: 7a1c9e4d2b10
+Create Date: 2026-10-18 10:02:47.930118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f1a05d37'
+down_revision: Union[str, Sequence[str], None] = '7a1c9e4d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('status', sa.String(length=20), server_default='ready', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('books', 'status')
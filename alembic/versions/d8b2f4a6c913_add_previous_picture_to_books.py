@@ -0,0 +1,28 @@
+"""add previous picture to books
+
+Revision ID: d8b2f4a6c913
+Revises: a3f5c8e1b7d4
+Create Date: 2026-10-18 16:41:09.274615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b2f4a6c913'
+down_revision: Union[str, Sequence[str], None] = 'a3f5c8e1b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('previous_picture', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('books', 'previous_picture')
@@ -0,0 +1,58 @@
+"""add composite keys to association tables
+
+Revision ID: e5b3d9c7a412
+Revises: c2e8f1a05d37
+Create Date: 2026-10-18 11:26:13.402776
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b3d9c7a412'
+down_revision: Union[str, Sequence[str], None] = 'c2e8f1a05d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabel, kolom kiri, kolom kanan)
+ASSOCIATIONS = [
+    ('user_roles', 'user_id', 'role_id'),
+    ('role_permissions', 'role_id', 'permission_id'),
+]
+
+
+def _dedupe(table: str, left: str, right: str) -> None:
+    # Buang baris NULL dan duplikat sebelum primary key dibuat
+    op.execute(
+        f'CREATE TABLE {table}_dedupe AS '
+        f'SELECT DISTINCT {left}, {right} FROM {table} '
+        f'WHERE {left} IS NOT NULL AND {right} IS NOT NULL'
+    )
+    op.execute(f'DELETE FROM {table}')
+    op.execute(
+        f'INSERT INTO {table} ({left}, {right}) '
+        f'SELECT {left}, {right} FROM {table}_dedupe'
+    )
+    op.execute(f'DROP TABLE {table}_dedupe')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, left, right in ASSOCIATIONS:
+        _dedupe(table, left, right)
+        op.alter_column(table, left, existing_type=sa.Integer(), nullable=False)
+        op.alter_column(table, right, existing_type=sa.Integer(), nullable=False)
+        op.create_primary_key(f'pk_{table}', table, [left, right])
+        op.create_index(f'ix_{table}_{right}_{left}', table, [right, left], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, left, right in reversed(ASSOCIATIONS):
+        op.drop_index(f'ix_{table}_{right}_{left}', table_name=table)
+        op.drop_constraint(f'pk_{table}', table, type_='primary')
+        op.alter_column(table, right, existing_type=sa.Integer(), nullable=True)
+        op.alter_column(table, left, existing_type=sa.Integer(), nullable=True)
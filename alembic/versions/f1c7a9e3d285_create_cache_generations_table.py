@@ -0,0 +1,32 @@
+"""create cache generations table
+
+Revision ID: f1c7a9e3d285
+Revises: d8b2f4a6c913
+Create Date: 2026-10-18 18:05:33.681240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a9e3d285'
+down_revision: Union[str, Sequence[str], None] = 'd8b2f4a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cache_generations',
+    sa.Column('namespace', sa.String(length=50), nullable=False),
+    sa.Column('generation', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('namespace')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_generations')
@@ -0,0 +1,46 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+
+# Cache klaim JWT yang sudah diverifikasi, key = hash token (token asli tidak
+# disimpan), entry hidup sampai klaim "exp" token tersebut
+_lock = threading.Lock()
+_entries: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+
+
+def _key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def get(token: str) -> Optional[dict]:
+    key = _key(token)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return payload
+
+
+def set(token: str, payload: dict):
+    if settings.JWT_CLAIMS_CACHE_SIZE <= 0 or "exp" not in payload:
+        return
+    key = _key(token)
+    with _lock:
+        _entries[key] = (float(payload["exp"]), payload)
+        _entries.move_to_end(key)
+        while len(_entries) > settings.JWT_CLAIMS_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
@@ -12,14 +12,84 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     DB_NAME: str
     DATABASE_URL: str = ""
+    ASYNC_DATABASE_URL: str = ""
+    DB_ASYNC: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # /metrics dan /metrics/db-pool tanpa autentikasi: aktifkan hanya jika
+    # port aplikasi tidak terbuka ke publik (mis. di-scrape dari jaringan internal)
+    METRICS_ENABLED: bool = False
+    SERVER_TIMING_HEADER: bool = True
+    DB_DIAGNOSTICS: bool = False
+    SLOW_QUERY_THRESHOLD_MS: int = 100
+    N_PLUS_ONE_THRESHOLD: int = 5
+    SEARCH_TRIGRAM_THRESHOLD: float = 0.5
+    SEARCH_INDEX_SYNC_INTERVAL: int = 5
+    IMAGE_WORKERS: int = 2
+    IMAGE_WORKER_MAX_TASKS: int = 200
+    IMAGE_QUEUE_SIZE: int = 64
+    BOOK_PICTURE_SIZES: list[int] = [128, 512]
+    BOOK_PICTURE_FORMATS: list[str] = ["webp", "jpeg"]
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    MAX_REQUEST_BYTES: int = 11 * 1024 * 1024
+    MAX_BULK_REQUEST_BYTES: int = 2 * 1024 * 1024 * 1024
+    BULK_BATCH_SIZE: int = 1000
+    BULK_MAX_ERRORS: int = 1000
+    STREAM_YIELD_PER: int = 1000
+    BOOK_PURGE_RETENTION_DAYS: int = 30
+    BOOK_PURGE_INTERVAL: int = 3600
+    BOOK_PURGE_BATCH_SIZE: int = 500
+    MAX_IMAGE_PIXELS: int = 40_000_000
+    MAX_PICTURE_DIMENSION: int = 2048
+    SERVE_UPLOADS: bool = True
+    UPLOAD_CACHE_MAX_AGE: int = 31536000
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL: int = 300
+    RESPONSE_CACHE_SIZE: int = 1024
+    # backend memory: jeda maksimal sampai invalidasi dari worker lain terlihat
+    RESPONSE_CACHE_SYNC_INTERVAL: int = 2
+    REDIS_URL: str = "redis://localhost:6379/0"
     JWT_EXPIRE_MINUTES: int = 60
+    # Cache permission per proses; perubahan role/permission dari worker lain
+    # mengosongkan cache lewat permission_versions, jadi data basi paling lama
+    # PERMISSION_SYNC_INTERVAL detik (TTL hanya batas atas untuk cache lokal)
+    PERMISSION_CACHE_TTL: int = 60
+    PERMISSION_CACHE_SIZE: int = 1024
+    JWT_EMBED_PERMISSIONS: bool = False
+    JWT_BACKEND: str = "jose"
+    JWT_CLAIMS_CACHE_SIZE: int = 4096
+    JWT_REFRESH_EXPIRE_MINUTES: int = 60 * 24 * 14
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_INTERVAL: int = 5
+    PERMISSION_SYNC_INTERVAL: int = 5
+    PASSWORD_SCHEMES: list[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_TIME_COST: int = 3
+    ARGON2_PARALLELISM: int = 4
+    HASH_WORKERS: int = 2
+    # Login menunggu hash secara async, tapi hash_password/verify_password versi
+    # sync (register, update user) menahan satu thread AnyIO (default 40) selama
+    # job antre; jaga nilai ini jauh di bawah batas threadpool
+    HASH_QUEUE_SIZE: int = 16
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.DATABASE_URL = (
-            f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}"
-            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
-        )
+        # URL eksplisit dari env (mis. SQLite untuk benchmark) tidak ditimpa
+        if not self.DATABASE_URL:
+            self.DATABASE_URL = (
+                f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}"
+                f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+            )
+        if not self.ASYNC_DATABASE_URL:
+            self.ASYNC_DATABASE_URL = (
+                f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}"
+                f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+            )
 
     # Read environment variables
     class Config:
@@ -0,0 +1,114 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram, register_collector
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Waktu menunggu koneksi dari pool",
+    labelnames=("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkout yang gagal karena pool penuh",
+    labelnames=("engine",),
+)
+POOL_CONNECTS = Counter(
+    "db_pool_connects_total", "Koneksi baru ke database", labelnames=("engine",)
+)
+POOL_INVALIDATIONS = Counter(
+    "db_pool_invalidations_total",
+    "Koneksi yang di-invalidate (disconnect, error, recycle)",
+    labelnames=("engine",),
+)
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Status koneksi di pool",
+    labelnames=("engine", "state"),
+)
+
+_engines = {}
+
+
+class _InstrumentedPool:
+    engine_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            POOL_CHECKOUT_TIMEOUTS.inc(engine=self.engine_label)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(
+                time.perf_counter() - start, engine=self.engine_label
+            )
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    engine_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def engine_options(poolclass=InstrumentedQueuePool) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def instrument(engine, label: str):
+    _engines[label] = engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.inc(engine=label)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.inc(engine=label)
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.inc(engine=label)
+
+
+def pool_status(label: str) -> dict:
+    pool = _engines[label].pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": settings.DB_POOL_TIMEOUT,
+        "recycle": settings.DB_POOL_RECYCLE,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+        "connects": POOL_CONNECTS.value(engine=label),
+        "invalidations": POOL_INVALIDATIONS.value(engine=label),
+        "checkout_timeouts": POOL_CHECKOUT_TIMEOUTS.value(engine=label),
+        "checkout_wait_seconds": POOL_CHECKOUT_WAIT.summary(engine=label),
+    }
+
+
+def all_pool_status() -> dict:
+    return {label: pool_status(label) for label in _engines}
+
+
+@register_collector
+def _collect_pool_connections():
+    for label, engine in _engines.items():
+        pool = engine.pool
+        POOL_CONNECTIONS.set(pool.checkedout(), engine=label, state="checked_out")
+        POOL_CONNECTIONS.set(pool.checkedin(), engine=label, state="checked_in")
+        POOL_CONNECTIONS.set(pool.overflow(), engine=label, state="overflow")
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.role import PermissionVersion
+from app.schemas.auth import CurrentUser
+
+logger = logging.getLogger(__name__)
+
+# Cache permission per username (in-process), dibatasi TTL dan ukuran.
+# clear() hanya berlaku di proses ini; worker lain ikut dikosongkan saat sync()
+# melihat versi baru di permission_versions
+_lock = threading.Lock()
+_entries: "OrderedDict[str, tuple[float, CurrentUser]]" = OrderedDict()
+# Salinan lokal versi di tabel permission_versions, dipakai untuk menolak
+# klaim token lama; worker lain menyusul paling lambat PERMISSION_SYNC_INTERVAL
+_version = 0
+
+
+def get_version() -> int:
+    return _version
+
+
+def get_user(username: str) -> Optional[CurrentUser]:
+    with _lock:
+        entry = _entries.get(username)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del _entries[username]
+            return None
+        _entries.move_to_end(username)
+        return user
+
+
+def set_user(username: str, user: CurrentUser, version: Optional[int] = None):
+    if settings.PERMISSION_CACHE_SIZE <= 0:
+        return
+    with _lock:
+        # data dibaca sebelum ada perubahan role/permission, jangan disimpan
+        if version is not None and version != _version:
+            return
+        _entries[username] = (time.monotonic() + settings.PERMISSION_CACHE_TTL, user)
+        _entries.move_to_end(username)
+        while len(_entries) > settings.PERMISSION_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def bump(db: Session) -> int:
+    # Naikkan versi di transaksi yang sama dengan perubahan role/permission,
+    # panggil sebelum commit lalu teruskan hasilnya ke clear() setelah commit
+    result = db.execute(
+        update(PermissionVersion)
+        .where(PermissionVersion.id == 1)
+        .values(version=PermissionVersion.version + 1)
+    )
+    if not result.rowcount:
+        db.add(PermissionVersion(id=1, version=1))
+        db.flush()
+    return db.scalar(select(PermissionVersion.version).where(PermissionVersion.id == 1))
+
+
+def clear(version: Optional[int] = None):
+    global _version
+    with _lock:
+        _entries.clear()
+        if version is not None:
+            _version = version
+
+
+def sync(db: Session):
+    # Ambil versi terbaru (perubahan dari worker/proses lain)
+    version = (
+        db.scalar(select(PermissionVersion.version).where(PermissionVersion.id == 1))
+        or 0
+    )
+    if version != _version:
+        clear(version)
+
+
+def sync_from_db():
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        sync(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to sync permission version")
+    finally:
+        db.close()
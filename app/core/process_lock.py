@@ -0,0 +1,33 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: dianggap selalu satu proses
+    fcntl = None
+
+# Lock antar worker uvicorn di host yang sama, dipakai supaya job latar
+# (resume gambar, purge buku) hanya jalan di satu proses. Lock dipegang sampai
+# proses berhenti; OS melepasnya otomatis jika proses mati.
+LOCK_DIR = os.path.abspath("app/uploads/locks")
+
+_lock = threading.Lock()
+_held = {}
+
+
+def acquire(name: str) -> bool:
+    """True jika proses ini memegang lock `name` (tidak menunggu)."""
+    if fcntl is None:
+        return True
+    with _lock:
+        if name in _held:
+            return True
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        file = open(os.path.join(LOCK_DIR, f"{name}.lock"), "w")
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+        _held[name] = file
+        return True
@@ -0,0 +1,132 @@
+"""Diagnostik query untuk development (aktif jika DB_DIAGNOSTICS=true).
+
+- Slow query log: statement yang lebih lama dari SLOW_QUERY_THRESHOLD_MS
+  di-log beserta hasil EXPLAIN.
+- Detektor N+1: statement (setelah dinormalisasi) yang dijalankan lebih dari
+  N_PLUS_ONE_THRESHOLD kali dalam satu request dilaporkan beserta fungsi
+  asal di kode aplikasi.
+
+Mengambil stack frame tiap query dan EXPLAIN memakai koneksi tambahan dari
+pool, jadi jangan diaktifkan di production.
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from sqlalchemy import event
+from app.core import request_stats
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# modul infrastruktur, dilewati saat mencari fungsi asal query
+_SKIP_FILES = {
+    os.path.abspath(__file__),
+    os.path.abspath(request_stats.__file__),
+    os.path.join(APP_DIR, "database.py"),
+    os.path.join(APP_DIR, "helpers", "service.py"),
+    os.path.join(APP_DIR, "helpers", "timing.py"),
+    os.path.join(APP_DIR, "helpers", "upload.py"),
+}
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN "}
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    # IN (?, ?, ?) dan literal disamakan, supaya variasi jumlah id tetap satu grup
+    statement = _IN_LIST.sub("(?)", statement)
+    statement = _LITERAL.sub("?", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+def origin() -> str:
+    # frame terdalam di kode aplikasi (service/router/core) yang memicu query
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename not in _SKIP_FILES:
+            module = os.path.relpath(filename, APP_DIR)[:-3].replace(os.sep, ".")
+            return f"app.{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def explain(explain_engine, statement: str, parameters) -> str:
+    # hanya SELECT; EXPLAIN untuk DML tidak berguna di semua dialect
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = EXPLAIN_PREFIX.get(explain_engine.dialect.name, "EXPLAIN ")
+    connection = explain_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" | ".join(map(str, row)) for row in cursor.fetchall())
+    except Exception as e:
+        return f"(EXPLAIN gagal: {e})"
+    finally:
+        connection.close()
+
+
+def install(engine, explain_engine=None):
+    """Pasang listener di engine sync (untuk async: async_engine.sync_engine).
+
+    EXPLAIN selalu dijalankan lewat explain_engine (engine sync) karena
+    raw_connection engine async tidak bisa dipakai di luar greenlet.
+    """
+    explain_engine = explain_engine or engine
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("diagnostics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["diagnostics_started"].pop()
+        source = origin()
+        stats = request_stats.current()
+        if stats is not None:
+            if stats.queries is None:
+                stats.queries = {}
+            entry = stats.queries.setdefault(normalize(statement), [0, Counter()])
+            entry[0] += 1
+            entry[1][source] += 1
+        if elapsed >= threshold and not executemany:
+            plan = explain(explain_engine, statement, parameters)
+            logger.warning(
+                "Slow query (%.1f ms) from %s:\n%s\nparams: %r%s",
+                elapsed * 1000,
+                source,
+                statement,
+                parameters,
+                f"\nEXPLAIN:\n{plan}" if plan else "",
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("diagnostics_started"):
+            conn.info["diagnostics_started"].pop()
+
+
+def report(method: str, route: str, stats):
+    """Log statement yang berulang melebihi N_PLUS_ONE_THRESHOLD dalam satu request."""
+    if not stats.queries:
+        return
+    for statement, (count, sources) in stats.queries.items():
+        if count > settings.N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "Possible N+1 on %s %s: %d x %s\nfrom: %s",
+                method,
+                route,
+                count,
+                statement,
+                ", ".join(f"{name} ({n}x)" for name, n in sources.most_common(3)),
+            )
@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Statistik per request (waktu DB, jumlah query, fase lain seperti hash/image).
+# ContextVar ikut tersalin ke threadpool dan greenlet run_sync, dan objeknya
+# mutable, jadi service sync maupun async menulis ke objek yang sama.
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("started", "db_seconds", "db_statements", "phases", "queries")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_statements = 0
+        self.phases = {}
+        # statement ternormalisasi -> [jumlah, asal], hanya diisi query_diagnostics
+        self.queries = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+def start() -> RequestStats:
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def current():
+    return _current.get()
+
+
+def record(phase: str, seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.add(phase, seconds)
+
+
+@contextmanager
+def measure(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+def track_queries(engine):
+    # engine sync (untuk async: async_engine.sync_engine)
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.db_seconds += time.perf_counter() - started
+            stats.db_statements += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # query gagal: after_cursor_execute tidak dipanggil
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
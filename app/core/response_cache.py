@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.models.cache import CacheGeneration
+
+logger = logging.getLogger(__name__)
+
+# namespace cache
+BOOKS = "books"
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Lookup response cache per hasil",
+    labelnames=("namespace", "result"),
+)
+
+
+class MemoryBackend:
+    """LRU in-process dengan TTL.
+
+    Invalidasi langsung berlaku di proses ini; worker lain menyusul lewat
+    tabel cache_generations paling lambat RESPONSE_CACHE_SYNC_INTERVAL detik.
+    """
+
+    blocking = False
+    shared = False
+
+    def __init__(self, size: int, ttl: int):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, tuple[str, bytes]]]" = (
+            OrderedDict()
+        )
+        self._generations = {}
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace: str, generation: int = None):
+        with self._lock:
+            if generation is None:
+                generation = self._generations.get(namespace, 0) + 1
+            self._generations[namespace] = generation
+            prefix = f"{namespace}:"
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: tuple[str, bytes]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+class RedisBackend:
+    """Redis (atau server kompatibel) yang dipakai bersama semua worker."""
+
+    blocking = True
+    shared = True
+
+    def __init__(self, url: str, ttl: int):
+        import redis  # opsional, hanya dibutuhkan untuk backend redis
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+
+    def generation(self, namespace: str) -> int:
+        return int(self._client.get(f"cache:{namespace}:generation") or 0)
+
+    def bump(self, namespace: str):
+        # key generasi lama tidak dihapus, habis sendiri oleh TTL
+        self._client.incr(f"cache:{namespace}:generation")
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        value = self._client.get(f"cache:{key}")
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body
+
+    def set(self, key: str, value: tuple[str, bytes]):
+        etag, body = value
+        self._client.set(f"cache:{key}", etag.encode() + b"\n" + body, ex=self.ttl)
+
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL, settings.RESPONSE_CACHE_TTL)
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL)
+    return None
+
+
+backend = _create_backend()
+
+
+# Backend yang gagal (mis. Redis mati) diperlakukan sebagai cache miss,
+# request tetap dilayani dari DB
+
+
+def make_key(namespace: str, *parts) -> Optional[str]:
+    if backend is None:
+        return None
+    try:
+        generation = backend.generation(namespace)
+    except Exception:
+        logger.exception("Response cache unavailable")
+        return None
+    return f"{namespace}:{generation}:" + "|".join(str(part) for part in parts)
+
+
+def get(namespace: str, key: Optional[str]):
+    if key is None:
+        return None
+    try:
+        value = backend.get(key)
+    except Exception:
+        logger.exception("Response cache get failed")
+        return None
+    CACHE_REQUESTS.inc(namespace=namespace, result="miss" if value is None else "hit")
+    return value
+
+
+def set(key: Optional[str], value: tuple[str, bytes]):
+    if key is None:
+        return
+    try:
+        backend.set(key, value)
+    except Exception:
+        logger.exception("Response cache set failed")
+
+
+def invalidate(namespace: str):
+    if backend is None:
+        return
+    try:
+        backend.bump(namespace)
+    except Exception:
+        logger.exception("Response cache invalidation failed for %s", namespace)
+        return
+    if not backend.shared:
+        # ditulis di thread sendiri: invalidate bisa dipanggil dari event loop
+        # (db.run_sync pada mode DB_ASYNC)
+        _get_publisher().submit(_publish, namespace)
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def _get_publisher():
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="cache-publish"
+            )
+        return _publisher
+
+
+def _publish(namespace: str):
+    # Naikkan generasi bersama supaya backend memory di worker lain ikut kosong
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(CacheGeneration)
+            .where(CacheGeneration.namespace == namespace)
+            .values(generation=CacheGeneration.generation + 1)
+        )
+        if not result.rowcount:
+            db.add(CacheGeneration(namespace=namespace, generation=1))
+        db.commit()
+        generation = db.scalar(
+            select(CacheGeneration.generation).where(
+                CacheGeneration.namespace == namespace
+            )
+        )
+        # generasi lokal disamakan, sync berikutnya tidak mengosongkan ulang
+        backend.bump(namespace, generation)
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to publish cache generation for %s", namespace)
+    finally:
+        db.close()
+
+
+def sync(db):
+    # Ambil invalidasi dari worker lain (hanya backend memory)
+    if backend is None or backend.shared:
+        return
+    rows = db.execute(select(CacheGeneration.namespace, CacheGeneration.generation))
+    for namespace, generation in rows:
+        if generation != backend.generation(namespace):
+            backend.bump(namespace, generation)
+
+
+def sync_from_db():
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        sync(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to sync response cache generations")
+    finally:
+        db.close()
@@ -0,0 +1,93 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.token import RevokedToken
+from app.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+# Bloom filter di depan tabel revoked_tokens: jti yang tidak ada di filter
+# pasti belum dicabut, jadi sebagian besar request tidak menyentuh DB
+_bloom = BloomFilter(
+    settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE
+)
+_lock = threading.Lock()
+# revoked_at terakhir yang sudah dimuat dari DB (pencabutan dari worker lain)
+_synced_at = None
+
+
+def might_be_revoked(jti: str) -> bool:
+    return jti in _bloom
+
+
+def is_revoked(db: Session, jti: str) -> bool:
+    if jti not in _bloom:
+        return False
+    return db.get(RevokedToken, jti) is not None
+
+
+def revoke(db: Session, jti: str, token_type: str, expires_at: datetime) -> bool:
+    # False jika jti sudah dicabut sebelumnya (mis. refresh token dipakai ulang)
+    db.add(RevokedToken(jti=jti, token_type=token_type, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        _bloom.add(jti)
+        return False
+    _bloom.add(jti)
+    return True
+
+
+def load(db: Session):
+    # Bangun ulang filter dari DB dan buang token yang sudah kedaluwarsa
+    global _synced_at
+    now = datetime.utcnow()
+    db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    with _lock:
+        _bloom.clear()
+        for (jti,) in db.query(RevokedToken.jti):
+            _bloom.add(jti)
+        _synced_at = now
+
+
+def sync(db: Session):
+    # Ambil pencabutan baru dari worker/proses lain sejak sync terakhir
+    global _synced_at
+    with _lock:
+        since = _synced_at
+    # filter penuh -> false positive naik, bangun ulang tanpa token kedaluwarsa
+    if since is None or _bloom.count > settings.REVOCATION_BLOOM_CAPACITY:
+        return load(db)
+    now = datetime.utcnow()
+    # overlap agar tidak ada yang terlewat karena commit yang terlambat
+    overlap = timedelta(seconds=settings.REVOCATION_SYNC_INTERVAL * 2)
+    rows = db.query(RevokedToken.jti).filter(RevokedToken.revoked_at >= since - overlap)
+    for (jti,) in rows:
+        _bloom.add(jti)
+    with _lock:
+        _synced_at = now
+
+
+def sync_from_db(full: bool = False):
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if full:
+            load(db)
+        else:
+            sync(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to sync revoked tokens")
+    finally:
+        db.close()
@@ -2,10 +2,14 @@ from fastapi import Depends, Security, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
 from app.core.config import settings
-from app.database import get_db
+from app.core import claims_cache, permission_cache, revocation
+from app.database import AsyncSessionLocal, SessionLocal
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.services.user_service import get_user_by_username
+from app.services.user_service import get_user_permissions
+from app.schemas.auth import CurrentUser
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 
 def create_access_token(data: dict, expires_delta: int = None):
@@ -13,49 +17,148 @@ def create_access_token(data: dict, expires_delta: int = None):
     expire = datetime.utcnow() + timedelta(
         minutes=expires_delta or settings.JWT_EXPIRE_MINUTES
     )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
-bearer_scheme = HTTPBearer()
+def create_refresh_token(username: str):
+    expire = datetime.utcnow() + timedelta(minutes=settings.JWT_REFRESH_EXPIRE_MINUTES)
+    to_encode = {"sub": username, "type": "refresh", "exp": expire, "jti": uuid4().hex}
+    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
-    db: Session = Depends(get_db),
-):
-    token = credentials.credentials
-    credentials_exception = HTTPException(
+def permission_claims(user: CurrentUser):
+    return {
+        "uid": user.id,
+        "email": user.email,
+        "perms": sorted(user.permissions),
+        "pv": permission_cache.get_version(),
+    }
+
+
+if settings.JWT_BACKEND == "pyjwt":
+    import jwt as pyjwt
+
+    def _decode(token: str) -> dict:
+        return pyjwt.decode(
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+        )
+
+else:
+
+    def _decode(token: str) -> dict:
+        return jwt.decode(
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+        )
+
+
+def credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+
+
+def decode_token(token: str, token_type: str = "access") -> dict:
+    # Access token yang sama dipakai berulang kali, lewati verifikasi HMAC
+    # selama token belum exp; cek revocation tetap jalan di get_token_payload
+    payload = claims_cache.get(token) if token_type == "access" else None
+    if payload is None:
+        try:
+            payload = _decode(token)
+        except Exception:
+            raise credentials_exception()
+        if token_type == "access":
+            claims_cache.set(token, payload)
+    # token lama tanpa klaim "type" dianggap access token
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        raise credentials_exception()
+    return payload
+
+
+bearer_scheme = HTTPBearer()
+
+
+async def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
+) -> dict:
+    payload = decode_token(credentials.credentials)
+    jti = payload.get("jti")
+    # cek Bloom filter dulu, DB hanya disentuh jika jti mungkin dicabut
+    if jti and revocation.might_be_revoked(jti):
+        if await _with_session(revocation.is_revoked, jti):
+            raise credentials_exception()
+    return payload
+
+
+async def get_current_user(payload: dict = Depends(get_token_payload)):
+    username = payload["sub"]
+
+    # Permission dari token hanya dipakai jika versinya masih berlaku
+    if (
+        settings.JWT_EMBED_PERMISSIONS
+        and "perms" in payload
+        and payload.get("pv") == permission_cache.get_version()
+    ):
+        return CurrentUser(
+            id=payload["uid"],
+            username=username,
+            email=payload["email"],
+            permissions=frozenset(payload["perms"]),
         )
-        username = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except Exception:
-        raise credentials_exception
-
-    user = get_user_by_username(db, username)
-    if not user:
-        raise credentials_exception
+
+    user = permission_cache.get_user(username)
+    if user is None:
+        version = permission_cache.get_version()
+        user = await _with_session(load_current_user, username)
+        if not user:
+            raise credentials_exception()
+        permission_cache.set_user(username, user, version)
+
+    return user
+
+
+def build_current_user(user) -> CurrentUser:
     permissions = set()
     for role in user.roles:
-
         for perm in getattr(role, "permissions", []):
             permissions.add(perm.name)
-    setattr(user, "permissions", list(permissions))
 
-    return user
+    return CurrentUser(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        permissions=frozenset(permissions),
+    )
+
+
+async def _with_session(func, *args):
+    # Jalankan fungsi sync func(db, *args) dengan session sesuai mode DB
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(func, *args)
+    return await run_in_threadpool(_with_sync_session, func, *args)
+
+
+def _with_sync_session(func, *args):
+    db = SessionLocal()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+def load_current_user(db: Session, username: str):
+    data = get_user_permissions(db, username)
+    if data is None:
+        return None
+    return CurrentUser(username=username, **data)
 
 
 def require_permission(permission: str):
-    def permission_checker(current_user=Depends(get_current_user)):
-        if permission not in getattr(current_user, "permissions", []):
+    async def permission_checker(current_user=Depends(get_current_user)):
+        if permission not in current_user.permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail=f"Tidak memiliki akses"
             )
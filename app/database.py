@@ -2,14 +2,36 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, engine_options, instrument
+from app.core import query_diagnostics
+from app.core.request_stats import track_queries
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options())
+instrument(engine, "sync")
+track_queries(engine)
+if settings.DB_DIAGNOSTICS:
+    query_diagnostics.install(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async hanya dibuat jika DB_ASYNC aktif (butuh driver aiomysql)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        **engine_options(InstrumentedAsyncQueuePool),
+    )
+    instrument(async_engine.sync_engine, "async")
+    track_queries(async_engine.sync_engine)
+    if settings.DB_DIAGNOSTICS:
+        query_diagnostics.install(async_engine.sync_engine, explain_engine=engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
 Base = declarative_base()
 
 
@@ -19,3 +41,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_session = get_async_db if settings.DB_ASYNC else get_db
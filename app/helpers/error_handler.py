@@ -1,13 +1,16 @@
+import logging
 from fastapi import Request, HTTPException
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from app.helpers.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
 
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     # cek apakah ini JSON invalid
     for err in exc.errors():
         if err.get("type") == "json_invalid":
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=422,
                 content={"errors": "JSON decode error"},
             )
@@ -34,7 +37,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     else:
         error_message = errors[0] if errors else "Validation error"
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={"errors": error_message},
     )
@@ -42,15 +45,20 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 # handler untuk HTTPException
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"status_code": exc.status_code, "detail": exc.detail},
+        # mis. Retry-After pada 503 antrean hash, WWW-Authenticate pada 401
+        headers=getattr(exc, "headers", None),
     )
 
 
 # handler untuk server error
 async def server_exception_handler(request: Request, exc: Exception):
-    return JSONResponse(
+    logger.error(
+        "Unhandled error on %s %s", request.method, request.url.path, exc_info=exc
+    )
+    return ORJSONResponse(
         status_code=500,
         content={"error": "Terjadi kesalahan pada server (500)"},
     )
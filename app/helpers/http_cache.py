@@ -0,0 +1,53 @@
+import hashlib
+from functools import lru_cache
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from app.core import response_cache
+from app.helpers.static import etag_matches
+
+# Data buku butuh auth, jadi hanya boleh disimpan browser dan wajib revalidasi
+CACHE_CONTROL = "private, no-cache"
+
+
+async def _call(func, *args):
+    if response_cache.backend is not None and response_cache.backend.blocking:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+@lru_cache(maxsize=None)
+def _adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def render_json(model, data, exclude_none: bool = False) -> bytes:
+    """Validasi + serialisasi sekali jalan di pydantic-core (tanpa jsonable_encoder)."""
+    adapter = _adapter(model)
+    value = adapter.validate_python(data, from_attributes=True)
+    return adapter.dump_json(value, exclude_none=exclude_none)
+
+
+async def cached_json(
+    request: Request,
+    namespace: str,
+    parts: tuple,
+    produce,
+    model,
+    exclude_none: bool = False,
+):
+    """Response JSON dengan cache dan ETag; produce() hanya dipanggil saat miss."""
+    key = await _call(response_cache.make_key, namespace, *parts)
+    cached = await _call(response_cache.get, namespace, key)
+    if cached is None:
+        body = render_json(model, await produce(), exclude_none)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        cached = (etag, body)
+        await _call(response_cache.set, key, cached)
+
+    etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+            raise ValueError(cursor)
+        return values
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def cursor_paginate(
+    query, id_column, per_page: int, after: str = None, include_total: bool = False
+):
+    # Keyset pagination berdasarkan id, tanpa OFFSET dan COUNT (kecuali diminta)
+    total = query.order_by(None).count() if include_total else None
+    if after:
+        query = query.filter(id_column > decode_cursor(after)["id"])
+
+    rows = query.order_by(id_column).limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor({"id": rows[-1].id})
+
+    meta = {"per_page": per_page, "next_cursor": next_cursor}
+    if include_total:
+        meta["total"] = total
+    return rows, meta
@@ -0,0 +1,13 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse yang dirender dengan orjson (dipakai untuk konten dict biasa).
+
+    Route dengan response_model tetap memakai response class default supaya
+    FastAPI bisa serialisasi langsung lewat pydantic-core.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
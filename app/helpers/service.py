@@ -0,0 +1,9 @@
+import inspect
+from starlette.concurrency import run_in_threadpool
+
+
+async def run_service(func, *args, **kwargs):
+    # service async langsung di-await, service sync dijalankan di threadpool
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await run_in_threadpool(func, *args, **kwargs)
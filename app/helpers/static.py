@@ -0,0 +1,145 @@
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class StaticFileResponse(Response):
+    """FileResponse untuk file immutable: ETag, 304, Range, dan zero-copy send."""
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        request_headers: Headers,
+        media_type: str,
+        cache_control: str,
+        send_body: bool = True,
+    ):
+        self.path = path
+        self.send_body = send_body
+        self.media_type = media_type
+        self.background = None
+        self.body = b""
+        self.offset = 0
+        self.length = size = stat_result.st_size
+        etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+        headers = {
+            "etag": etag,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": cache_control,
+            "accept-ranges": "bytes",
+        }
+
+        if _not_modified(request_headers, etag, stat_result.st_mtime):
+            self.status_code = 304
+            self.length = 0
+            self.init_headers(headers)
+            return
+
+        self.status_code = 200
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range == etag):
+            byte_range = _parse_range(range_header, size)
+            if byte_range is None:
+                self.status_code = 416
+                self.length = 0
+                headers["content-range"] = f"bytes */{size}"
+                headers["content-length"] = "0"
+                self.init_headers(headers)
+                return
+            if byte_range != (0, size - 1):
+                start, end = byte_range
+                self.status_code = 206
+                self.offset, self.length = start, end - start + 1
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+        headers["content-length"] = str(self.length)
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            # server mendukung sendfile(), kirim langsung dari file descriptor
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.length,
+                    }
+                )
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(value: str, size: int):
+    # hanya single range; multi-range dilayani sebagai file penuh
+    if "," in value:
+        return (0, size - 1)
+    matched = _RANGE.match(value.strip())
+    if not matched or size == 0:
+        return None
+    start, end = matched.groups()
+    if start == "":
+        if end == "" or int(end) == 0:
+            return None
+        return (max(size - int(end), 0), size - 1)
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return None
+    return (start, end)
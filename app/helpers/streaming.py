@@ -0,0 +1,57 @@
+import csv
+import io
+from datetime import datetime
+import orjson
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.database import SessionLocal
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def stream_rows(statement, serialize, format: str = "ndjson", fields=None):
+    """Generator chunk NDJSON/CSV, satu chunk per partisi yield_per.
+
+    Memakai session sendiri karena session request sudah ditutup saat body
+    di-stream; dengan yield_per MySQL memakai server-side cursor sehingga
+    memori tetap konstan berapapun jumlah barisnya.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            statement.execution_options(yield_per=settings.STREAM_YIELD_PER)
+        )
+        if format != "csv":
+            # orjson langsung menghasilkan bytes dan paham datetime
+            for partition in result.partitions():
+                yield b"".join(
+                    orjson.dumps(serialize(row)) + b"\n" for row in partition
+                )
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for partition in result.partitions():
+            for row in partition:
+                item = serialize(row)
+                writer.writerow(_plain(item[field]) for field in fields)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # hanya header (tidak ada baris)
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def streaming_response(rows, format: str = "ndjson", filename: str = None):
+    headers = None
+    if filename:
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(rows, media_type=MEDIA_TYPES[format], headers=headers)
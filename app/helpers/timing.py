@@ -0,0 +1,101 @@
+from app.core import query_diagnostics, request_stats
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency request HTTP per route (sampai body selesai dikirim)",
+    labelnames=("method", "route", "status"),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Total waktu query database per request",
+    labelnames=("method", "route"),
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "Jumlah statement SQL per request",
+    labelnames=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_PHASE_TIME = Histogram(
+    "http_request_phase_seconds",
+    "Waktu per fase di dalam request (hash password, Pillow)",
+    labelnames=("method", "route", "phase"),
+)
+
+
+def _route_label(scope) -> str:
+    # template path (/books/{book_id}), bukan path asli, supaya label terbatas.
+    # scope["route"] adalah route asli di router (tanpa prefix include_router),
+    # jadi prefix diambil dari path request dikurangi bagian milik route.
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    try:
+        own = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if own and not path.endswith(own):
+        return template
+    return path[: len(path) - len(own)] + template
+
+
+def server_timing(stats) -> str:
+    entries = [
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.db_statements} queries"'
+    ]
+    for phase, seconds in stats.phases.items():
+        entries.append(f"{phase};dur={seconds * 1000:.2f}")
+    entries.append(f"app;dur={stats.elapsed() * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class RequestTimingMiddleware:
+    """Catat latency, waktu DB, jumlah query, dan fase lain untuk tiap request.
+
+    Ditulis sebagai middleware ASGI murni (bukan BaseHTTPMiddleware) supaya
+    tidak menambah task/stream per request dan response streaming tetap jalan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = request_stats.start()
+        status_code = 500
+
+        async def timed_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    headers = list(message.get("headers", []))
+                    value = server_timing(stats).encode("latin-1")
+                    headers.append((b"server-timing", value))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            self.observe(scope, stats, status_code)
+
+    @staticmethod
+    def observe(scope, stats, status_code: int):
+        method, route = scope["method"], _route_label(scope)
+        REQUEST_LATENCY.observe(
+            stats.elapsed(), method=method, route=route, status=status_code
+        )
+        REQUEST_DB_TIME.observe(stats.db_seconds, method=method, route=route)
+        REQUEST_DB_STATEMENTS.observe(stats.db_statements, method=method, route=route)
+        for phase, seconds in stats.phases.items():
+            REQUEST_PHASE_TIME.observe(seconds, method=method, route=route, phase=phase)
+        if settings.DB_DIAGNOSTICS:
+            query_diagnostics.report(method, route, stats)
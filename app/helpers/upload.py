@@ -0,0 +1,55 @@
+from fastapi import HTTPException, status
+from app.helpers.responses import ORJSONResponse
+
+
+class RequestSizeLimitMiddleware:
+    """Tolak request yang body-nya melebihi batas sebelum di-spool ke disk."""
+
+    def __init__(self, app, max_bytes: int, overrides: dict = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        # prefix path -> batas khusus, prefix terpanjang yang dipakai
+        self.overrides = sorted(
+            (overrides or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def limit_for(self, path: str) -> int:
+        for prefix, limit in self.overrides:
+            if path.startswith(prefix):
+                return limit
+        return self.max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limit_for(scope["path"])
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            response = ORJSONResponse(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                content={
+                    "status_code": status.HTTP_413_CONTENT_TOO_LARGE,
+                    "detail": "Request body is too large",
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        # untuk chunked transfer (tanpa Content-Length), hitung selama dibaca
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail="Request body is too large",
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,7 +1,16 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, suppress
+from starlette.concurrency import run_in_threadpool
 from app.core.openapi import custom_openapi
 from fastapi import FastAPI, HTTPException
 from fastapi.openapi.utils import get_openapi
-from app.routers import auth, user, book, role
+from app.core.config import settings
+from app.core import permission_cache, process_lock, response_cache, revocation
+from app.routers import auth, user, book, role, metrics, uploads
+from app.services import book_service, hash_service, image_service
+from app.helpers.timing import RequestTimingMiddleware
+from app.helpers.upload import RequestSizeLimitMiddleware
 from app.helpers.error_handler import (
     validation_exception_handler,
     server_exception_handler,
@@ -9,7 +18,72 @@ from app.helpers.error_handler import (
 )
 from fastapi.exceptions import RequestValidationError
 
-app = FastAPI(title="FastAPI JWT")
+
+async def sync_revocations():
+    # Ambil token yang dicabut oleh worker lain secara berkala
+    while True:
+        await asyncio.sleep(settings.REVOCATION_SYNC_INTERVAL)
+        await run_in_threadpool(revocation.sync_from_db)
+
+
+async def sync_permission_version():
+    # Ambil perubahan role/permission dari worker lain secara berkala
+    while True:
+        await asyncio.sleep(settings.PERMISSION_SYNC_INTERVAL)
+        await run_in_threadpool(permission_cache.sync_from_db)
+
+
+async def sync_response_cache():
+    # Ambil invalidasi response cache dari worker lain secara berkala
+    while True:
+        await asyncio.sleep(settings.RESPONSE_CACHE_SYNC_INTERVAL)
+        await run_in_threadpool(response_cache.sync_from_db)
+
+
+async def sync_search_index():
+    # Ambil buku yang diubah worker lain ke index trigram (non-MySQL)
+    while True:
+        await asyncio.sleep(settings.SEARCH_INDEX_SYNC_INTERVAL)
+        await run_in_threadpool(book_service.sync_search_index)
+
+
+async def purge_deleted_books():
+    # Hapus permanen buku yang di-soft-delete melewati masa retensi; hanya
+    # worker pemegang lock yang menjalankannya, worker lain mengambil alih
+    # jika worker itu berhenti
+    while True:
+        if process_lock.acquire("book-purge"):
+            await run_in_threadpool(book_service.purge_deleted)
+        await asyncio.sleep(settings.BOOK_PURGE_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(revocation.sync_from_db, True)
+    await run_in_threadpool(permission_cache.sync_from_db)
+    await run_in_threadpool(response_cache.sync_from_db)
+    revocation_task = asyncio.create_task(sync_revocations())
+    permission_task = asyncio.create_task(sync_permission_version())
+    cache_task = asyncio.create_task(sync_response_cache())
+    search_task = asyncio.create_task(sync_search_index())
+    purge_task = asyncio.create_task(purge_deleted_books())
+    threading.Thread(target=image_service.resume_pending, daemon=True).start()
+    yield
+    for task in (
+        revocation_task,
+        permission_task,
+        cache_task,
+        search_task,
+        purge_task,
+    ):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    image_service.shutdown()
+    hash_service.shutdown()
+
+
+app = FastAPI(title="FastAPI JWT", lifespan=lifespan)
 
 custom_openapi(app)
 
@@ -17,7 +91,21 @@ app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(Exception, server_exception_handler)
 
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_bytes=settings.MAX_REQUEST_BYTES,
+    overrides={"/books/bulk": settings.MAX_BULK_REQUEST_BYTES},
+)
+# paling luar, supaya request yang ditolak middleware lain ikut tercatat
+app.add_middleware(RequestTimingMiddleware)
+
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(user.router, prefix="/users", tags=["Users"])
 app.include_router(book.router, prefix="/books", tags=["Books"])
 app.include_router(role.router, prefix="/roles", tags=["Roles"])
+
+if settings.SERVE_UPLOADS:
+    app.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
+
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
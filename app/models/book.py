@@ -1,17 +1,36 @@
-from sqlalchemy import Column, Integer, String,DateTime, func
+from sqlalchemy import Boolean, Column, Computed, Integer, String,DateTime, Index, func, text
 from app.database import Base
 from datetime import datetime
 
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        Index(
+            "ix_books_title_author_fulltext", "title", "author", mysql_prefix="FULLTEXT"
+        ),
+        # hanya baris live; MySQL tidak punya partial index, jadi lewat kolom is_live
+        Index(
+            "ix_books_is_live_id",
+            "is_live",
+            "id",
+            sqlite_where=text("is_live = 1"),
+            postgresql_where=text("is_live"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(50), nullable=False)
     author = Column(String(100),  nullable=False)
     description = Column(String(255), nullable=False)
     picture = Column(String(255), nullable=False)
+    # gambar lama yang diganti picture yang sedang diproses, dihapus setelah selesai
+    previous_picture = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="ready", server_default="ready")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
-    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # diindex untuk purge_deleted (deleted_at < cutoff)
+    deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # generated column, dipakai semua query baca supaya kena ix_books_is_live_id
+    is_live = Column(Boolean, Computed("deleted_at IS NULL"))
 
    
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+# Generasi response cache per namespace, dibagi semua worker: backend memory
+# mengosongkan cache lokal saat generasi di tabel ini berubah
+class CacheGeneration(Base):
+    __tablename__ = "cache_generations"
+
+    namespace = Column(String(50), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0, server_default="0")
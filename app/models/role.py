@@ -1,19 +1,21 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 # Many-to-many User <-> Role
 user_roles = Table(
     "user_roles", Base.metadata,
-    Column("user_id", Integer, ForeignKey("users.id")),
-    Column("role_id", Integer, ForeignKey("roles.id"))
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True),
+    Index("ix_user_roles_role_id_user_id", "role_id", "user_id"),
 )
 
 # Many-to-many Role <-> Permission
 role_permissions = Table(
     "role_permissions", Base.metadata,
-    Column("role_id", Integer, ForeignKey("roles.id")),
-    Column("permission_id", Integer, ForeignKey("permissions.id"))
+    Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True),
+    Column("permission_id", Integer, ForeignKey("permissions.id"), primary_key=True),
+    Index("ix_role_permissions_permission_id_role_id", "permission_id", "role_id"),
 )
 
 class Role(Base):
@@ -33,3 +35,11 @@ class Permission(Base):
 
     roles = relationship("Role", secondary=role_permissions, back_populates="permissions")
 
+
+# Versi global permission (satu baris, id=1), naik setiap ada perubahan
+# role/permission/user; dibaca semua worker untuk menolak klaim token lama
+class PermissionVersion(Base):
+    __tablename__ = "permission_versions"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, Index
+from app.database import Base
+from datetime import datetime
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    jti = Column(String(64), primary_key=True)
+    token_type = Column(String(20), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.auth import LoginRequest, TokenResponse
-from app.services import auth_service
-from app.services.user_service import create_user, get_user_by_username
+from app.core.config import settings
+from app.database import get_session
+from app.helpers.service import run_service
+from typing import Optional
+from app.schemas.auth import LoginRequest, LogoutRequest, RefreshRequest, TokenResponse
 from fastapi import HTTPException, status
 from app.schemas.user import UserCreate, UserResponse
-from app.core.security import get_current_user
+from app.schemas.response import ResponseMessage
+from app.core.security import get_current_user, get_token_payload
+
+if settings.DB_ASYNC:
+    from app.services import async_auth_service as auth_service
+    from app.services import async_user_service as user_service
+else:
+    from app.services import auth_service, user_service
 
 router = APIRouter(
     tags=["Auth"],
@@ -29,10 +37,55 @@ Jika berhasil, API akan mengembalikan:
 - **422 Validation Error** → Input tidak sesuai format
 """,
 )
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = auth_service.authenticate_user(db, payload.username, payload.password)
-    token = auth_service.generate_token(user)
-    return {"access_token": token, "token_type": "bearer"}
+async def login(payload: LoginRequest, db: Session = Depends(get_session)):
+    return await run_service(auth_service.login, db, payload.username, payload.password)
+
+
+@router.post(
+    "/refresh",
+    status_code=status.HTTP_200_OK,
+    response_model=TokenResponse,
+    description="""
+Tukar refresh token dengan access token dan refresh token baru.  
+
+- **refresh_token**: Refresh token dari login atau refresh sebelumnya  
+
+Refresh token hanya bisa dipakai **satu kali** (rotasi). Simpan refresh token baru dari response.
+
+Jika berhasil:
+- **200 OK** → Access token dan refresh token baru
+Jika gagal:
+- **401 Unauthorized** → Refresh token tidak valid, kedaluwarsa, atau sudah dipakai
+""",
+)
+async def refresh(payload: RefreshRequest, db: Session = Depends(get_session)):
+    return await run_service(auth_service.refresh, db, payload.refresh_token)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_200_OK,
+    response_model=ResponseMessage,
+    description="""
+Cabut access token yang sedang dipakai (dan refresh token jika dikirim).  
+
+- Endpoint ini memerlukan **Authorization Header** dengan format:  
+  `Authorization: Bearer <access_token>`  
+- **refresh_token** (opsional): Refresh token milik user yang sama  
+
+Jika berhasil:
+- **200 OK** → Token dicabut
+Jika gagal:
+- **401 Unauthorized** → Token tidak valid atau sudah dicabut
+""",
+)
+async def logout(
+    payload: Optional[LogoutRequest] = None,
+    token_payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_session),
+):
+    refresh_token = payload.refresh_token if payload else None
+    return await run_service(auth_service.logout, db, token_payload, refresh_token)
 
 
 @router.get(
@@ -50,7 +103,7 @@ Jika gagal:
 - **401 Unauthorized** → Token tidak valid atau kedaluwarsa  
 """,
 )
-def get_profile(current_user=Depends(get_current_user)):
+async def get_profile(current_user=Depends(get_current_user)):
     return current_user
 
 
@@ -72,12 +125,12 @@ Jika gagal:
 - **422 Validation Error** → Format data tidak sesuai  
 """,
 )
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user_by_username(db, user.username)
+async def register_user(user: UserCreate, db: Session = Depends(get_session)):
+    db_user = await run_service(user_service.get_user_by_username, db, user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
-    new_user = create_user(db, user)
+    new_user = await run_service(user_service.create_user, db, user)
     return new_user
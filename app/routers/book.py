@@ -10,15 +10,29 @@ from fastapi import (
     status,
 )
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.core.config import settings
+from app.database import get_session
+from app.helpers.service import run_service
+from app.helpers.http_cache import cached_json
+from app.helpers.streaming import streaming_response
+from app.core.response_cache import BOOKS
+from starlette.concurrency import run_in_threadpool
 from app.schemas.book import (
     BookRequest,
     BookResponse,
     BookUpdateRequest,
+    BulkImportResponse,
+    PaginatedBooks,
     ShowBookResponse,
 )
-from app.services import book_service
+from app.schemas.response import ResponseMessage
 from app.core.security import require_permission
+from app.services import image_service
+
+if settings.DB_ASYNC:
+    from app.services import async_book_service as book_service
+else:
+    from app.services import book_service
 
 router = APIRouter(
     tags=["Books"], dependencies=[Depends(require_permission("custom_book"))]
@@ -38,24 +52,94 @@ Endpoint untuk membuat buku baru.
 - **picture**: Gambar buku, wajib diisi
 
 Jika berhasil:
-- **201 Created** → Mengembalikan data buku baru yang dibuat  
+- **201 Created** → Mengembalikan data buku baru yang dibuat, dengan `status` `processing` sampai gambar selesai diproses  
 
 Jika gagal:
 - **401 Unauthorized** → Token tidak valid atau kedaluwarsa
+- **400 Bad Request** → File bukan gambar JPEG/PNG/WebP yang valid
+- **413 Content Too Large** → Ukuran file atau dimensi gambar melebihi batas
 - **422 Validation Error** → Input tidak sesuai format yang diharapkan  
+- **503 Service Unavailable** → Antrian pemrosesan gambar sedang penuh  
 """,
 )
-def create_book(
+async def create_book(
     data: BookRequest = Depends(
         BookRequest.as_form,
     ),
     picture: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
 ):
     if picture.content_type not in ["image/jpeg", "image/png", "image/webp"]:
         raise HTTPException(status_code=400, detail="Only images are allowed")
 
-    return book_service.create_book(db, data, picture)
+    filename = await run_in_threadpool(image_service.stage_upload, picture)
+    return await run_service(book_service.create_book, db, data, filename)
+
+
+def _bulk_format(filename: Optional[str]) -> str:
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return "csv"
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    raise HTTPException(
+        status_code=400, detail="Unknown file format, use ?format=csv or ?format=ndjson"
+    )
+
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkImportResponse,
+    description="""
+Import banyak buku sekaligus dari file **CSV** atau **NDJSON**.  
+
+- **file**: CSV (dengan header) atau NDJSON, kolom `title`, `author`, `description`, `picture` (opsional)  
+- **images**: Zip berisi gambar (opsional), `picture` berisi nama file di dalam zip  
+- **format** (csv|ndjson, optional) → Default dari ekstensi file  
+
+Baris disimpan per batch (satu transaksi per batch). Baris yang tidak valid dilewati dan dilaporkan di `errors` beserta nomor barisnya.
+
+Jika berhasil:
+- **200 OK** → Jumlah `inserted`, `failed`, dan daftar `errors`
+
+Jika gagal:
+- **400 Bad Request** → Format file tidak dikenali, bukan UTF-8, atau images bukan zip
+- **401 Unauthorized** → Token tidak valid atau kedaluwarsa
+- **413 Content Too Large** → Ukuran request melebihi batas
+""",
+)
+async def bulk_import_books(
+    file: UploadFile = File(...),
+    images: Optional[UploadFile] = File(None),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_session),
+):
+    return await run_service(
+        book_service.bulk_import,
+        db,
+        file.file,
+        format or _bulk_format(file.filename),
+        images.file if images else None,
+    )
+
+
+@router.get(
+    "/export",
+    description="""
+Export semua buku sebagai **NDJSON** atau **CSV** secara streaming.  
+
+- **format** (ndjson|csv, default=ndjson) → Format output  
+
+Jika berhasil:
+- **200 OK** → File hasil export (di-stream, tidak dimuat penuh ke memori)
+- **401 Unauthorized** → Token tidak valid atau kedaluwarsa
+""",
+)
+async def export_books(format: str = Query("ndjson", pattern="^(csv|ndjson)$")):
+    return streaming_response(
+        book_service.export_books(format), format, f"books.{format}"
+    )
 
 
 @router.patch(
@@ -79,45 +163,86 @@ Jika gagal:
 - **422 Validation Error** → Input tidak sesuai format yang diharapkan
 """,
 )
-def update_book(
+async def update_book(
     book_id: int,
     data: BookRequest = Depends(BookUpdateRequest.as_form),
     picture: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
 ):
+    filename = None
     if picture:  # hanya proses jika ada file valid
         if picture.content_type not in ["image/jpeg", "image/png", "image/webp"]:
             raise HTTPException(status_code=400, detail="Only images are allowed")
-    else:
-        picture = None
+        filename = await run_in_threadpool(image_service.stage_upload, picture)
 
-    return book_service.update_book(db, data, book_id, picture)
+    return await run_service(book_service.update_book, db, data, book_id, filename)
 
 
 @router.get(
     "",
     summary="Get all Books",
+    response_model=PaginatedBooks,
     description="""
 Mengambil daftar buku dengan dukungan **pagination**.  
 
 Query parameter:
 - **search** (str, optional) → Mencari pengguna berdasarkan username atau email
+- **mode** (fulltext|substring, default=substring) → Mode pencarian, `fulltext` diurutkan berdasarkan relevansi  
 - **page** (int, default=1) → Halaman yang ingin ditampilkan  
 - **per_page** (int, default=10) → Jumlah item per halaman  
+- **pagination** (page|cursor, default=page) → Mode pagination  
+- **after** (str, optional) → Cursor dari `meta.next_cursor` (mode cursor)  
+- **include_total** (bool, default=false) → Hitung total data pada mode cursor  
+- **stream** (bool, default=false) → Kirim semua data yang cocok sebagai NDJSON secara streaming, tanpa pagination  
 
 Response:
-- **200 OK** → Daftar pengguna beserta metadata pagination  
+- **200 OK** → Daftar pengguna beserta metadata pagination, `picture` berisi ukuran gambar terkecil  
+- **304 Not Modified** → Data tidak berubah sejak `ETag` yang dikirim lewat `If-None-Match`  
 - **401 Unauthorized** → Token tidak valid atau kedaluwarsa  
 """,
 )
-def get_book(
+async def get_book(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     search: Optional[str] = Query(None, description="Search by title or author"),
+    mode: str = Query("substring", pattern="^(fulltext|substring)$"),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    pagination: str = Query("page", pattern="^(page|cursor)$"),
+    after: Optional[str] = Query(None, description="Cursor dari meta.next_cursor"),
+    include_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
-    return book_service.get_book(db, request, search, page, per_page)
+    if stream:
+        return streaming_response(book_service.stream_books(request, search, mode))
+    return await cached_json(
+        request,
+        BOOKS,
+        (
+            "list",
+            request.base_url,
+            search,
+            mode,
+            page,
+            per_page,
+            pagination,
+            after,
+            include_total,
+        ),
+        lambda: run_service(
+            book_service.get_book,
+            db,
+            request,
+            search,
+            page,
+            per_page,
+            after,
+            pagination == "cursor",
+            include_total,
+            mode,
+        ),
+        PaginatedBooks,
+    )
 
 
 @router.get(
@@ -129,24 +254,34 @@ Endpoint untuk mengambil data buku.
 - **book_id** : ID buku yang ingin diambil. Jika tidak disertakan, akan mengembalikan daftar semua buku.  
 
 Jika berhasil:
-- **200 OK** → Mengembalikan data buku (atau daftar buku)  
+- **200 OK** → Mengembalikan data buku (atau daftar buku), `pictures` dan `srcset` berisi semua ukuran/format gambar  
+- **304 Not Modified** → Data tidak berubah sejak `ETag` yang dikirim lewat `If-None-Match`  
 
 Jika gagal:
 - **401 Unauthorized** → Token tidak valid atau kedaluwarsa  
 - **404 Not Found** → Buku dengan ID tersebut tidak ditemukan  
 """,
 )
-def show_book(book_id: int, request: Request, db: Session = Depends(get_db)):
-    return book_service.show_book(book_id, request, db)
+async def show_book(book_id: int, request: Request, db: Session = Depends(get_session)):
+    return await cached_json(
+        request,
+        BOOKS,
+        ("show", request.base_url, book_id),
+        lambda: run_service(book_service.show_book, book_id, request, db),
+        ShowBookResponse,
+    )
 
 
 @router.delete(
     "/{book_id}",
+    response_model=ResponseMessage,
     description="""
 Endpoint untuk **menghapus buku** berdasarkan ID buku.  
 
 - **book_id** (path parameter): ID buku yang ingin dihapus  
 
+Buku di-*soft delete* (langsung hilang dari semua endpoint baca); baris dan file gambarnya dihapus permanen oleh purger background setelah `BOOK_PURGE_RETENTION_DAYS` hari.
+
 Jika berhasil:
 - **200 OK** → Pesan konfirmasi bahwa buku berhasil dihapus  
 Jika gagal:
@@ -154,5 +289,5 @@ Jika gagal:
 - **404 Not Found** → Buku dengan ID tersebut tidak ditemukan  
 """,
 )
-def delete_book(book_id: int, db: Session = Depends(get_db)):
-    return book_service.delete_book(db, book_id)
+async def delete_book(book_id: int, db: Session = Depends(get_session)):
+    return await run_service(book_service.delete_book, db, book_id)
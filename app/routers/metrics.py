@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core import metrics
+from app.core.db_pool import all_pool_status
+
+router = APIRouter(
+    tags=["Metrics"],
+    include_in_schema=False,
+)
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    description="Metrics aplikasi dalam format text Prometheus (internal).",
+)
+async def get_metrics():
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get(
+    "/db-pool",
+    description="Status connection pool database (internal).",
+)
+async def get_db_pool():
+    return all_pool_status()
@@ -1,16 +1,23 @@
 from app.schemas.response import ResponseMessage
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.core.config import settings
+from app.database import get_session
+from app.helpers.service import run_service
+from app.helpers.streaming import streaming_response
 from app.schemas.role import (
     RoleRequest,
     RoleResponse,
     AyncRolePermissionRequest,
     RoleDetailResponse,
 )
-from app.services import role_service
 from app.core.security import require_permission
 
+if settings.DB_ASYNC:
+    from app.services import async_role_service as role_service
+else:
+    from app.services import role_service
+
 router = APIRouter(
     tags=["Roles"], dependencies=[Depends(require_permission("custom_role_permission"))]
 )
@@ -23,6 +30,8 @@ router = APIRouter(
     description="""
 Endpoint untuk mengambil data role.  
 
+- **stream** (bool, default=false) → Kirim data sebagai NDJSON secara streaming  
+
 Jika berhasil:
 - **200 OK** → Mengembalikan data role (atau daftar role)  
 
@@ -30,8 +39,10 @@ Jika gagal:
 - **401 Unauthorized** → Token tidak valid atau kedaluwarsa 
 """,
 )
-def get_roles(db: Session = Depends(get_db)):
-    return role_service.get_roles(db)
+async def get_roles(db: Session = Depends(get_session), stream: bool = Query(False)):
+    if stream:
+        return streaming_response(role_service.stream_roles())
+    return await run_service(role_service.get_roles, db)
 
 
 @router.get(
@@ -51,8 +62,8 @@ Jika gagal:
 - **404 Not Found** → Role dengan ID tersebut tidak ditemukan  
 """,
 )
-def get_roles_by_id(role_id: int, db: Session = Depends(get_db)):
-    return role_service.get_roles_by_id(role_id, db)
+async def get_roles_by_id(role_id: int, db: Session = Depends(get_session)):
+    return await run_service(role_service.get_roles_by_id, role_id, db)
 
 
 @router.post(
@@ -72,8 +83,8 @@ Jika gagal:
 - **422 Validation Error** → Input tidak sesuai format yang diharapkan
 """,
 )
-def create_role(data: RoleRequest, db: Session = Depends(get_db)):
-    return role_service.create_role(db, data)
+async def create_role(data: RoleRequest, db: Session = Depends(get_session)):
+    return await run_service(role_service.create_role, db, data)
 
 
 @router.put(
@@ -95,8 +106,10 @@ Jika gagal:
 - **422 Validation Error** → Input tidak sesuai format yang diharapkan
 """,
 )
-def update_role(role_id: int, data: RoleRequest, db: Session = Depends(get_db)):
-    return role_service.update_role(db, data, role_id)
+async def update_role(
+    role_id: int, data: RoleRequest, db: Session = Depends(get_session)
+):
+    return await run_service(role_service.update_role, db, data, role_id)
 
 
 @router.delete(
@@ -116,8 +129,8 @@ Jika gagal:
 - **404 Not Found** → Role dengan ID tersebut tidak ditemukan
 """,
 )
-def delete_role(role_id: int, db: Session = Depends(get_db)):
-    return role_service.delete_role(db, role_id)
+async def delete_role(role_id: int, db: Session = Depends(get_session)):
+    return await run_service(role_service.delete_role, db, role_id)
 
 
 @router.post(
@@ -139,7 +152,7 @@ Jika gagal:
 - **422 Validation Error** → Input tidak sesuai format yang diharapkan
 """,
 )
-def assign_permission(
-    data: AyncRolePermissionRequest, role_id: int, db: Session = Depends(get_db)
+async def assign_permission(
+    data: AyncRolePermissionRequest, role_id: int, db: Session = Depends(get_session)
 ):
-    return role_service.assign_permission(db, data, role_id)
+    return await run_service(role_service.assign_permission, db, data, role_id)
@@ -0,0 +1,41 @@
+import os
+import re
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.helpers.static import StaticFileResponse
+from app.services.image_service import UPLOAD_DIR
+
+router = APIRouter(
+    tags=["Uploads"],
+    include_in_schema=False,
+)
+
+MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+# hanya nama file hasil pipeline gambar, tidak ada path traversal
+_FILENAME = re.compile(r"^[0-9a-f]+(?:_[0-9a-f]+)?(?:-\d+)?\.(jpg|webp|avif)$")
+
+
+@router.api_route("/{filename}", methods=["GET", "HEAD"])
+async def get_upload(filename: str, request: Request):
+    matched = _FILENAME.match(filename)
+    if not matched:
+        raise HTTPException(status_code=404, detail="File not found")
+    path = os.path.join(UPLOAD_DIR, filename)
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return StaticFileResponse(
+        path,
+        stat_result,
+        request.headers,
+        media_type=MEDIA_TYPES[matched.group(1)],
+        cache_control=(f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE}, immutable"),
+        send_body=request.method != "HEAD",
+    )
@@ -4,11 +4,18 @@ from app.schemas.response import (
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
+from app.core.config import settings
+from app.database import get_session
+from app.helpers.service import run_service
+from app.helpers.streaming import streaming_response
 from app.schemas.user import PaginatedUsers, UserCreate, UserResponse, UserUpdate
-from app.services import user_service
 from app.core.security import require_permission
 
+if settings.DB_ASYNC:
+    from app.services import async_user_service as user_service
+else:
+    from app.services import user_service
+
 
 router = APIRouter(
     tags=["Users"],
@@ -38,13 +45,14 @@ Jika gagal:
 - **422 Validation Error** → Input tidak sesuai format  
 """,
 )
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    return user_service.create_user(db, user)
+async def create_user(user: UserCreate, db: Session = Depends(get_session)):
+    return await run_service(user_service.create_user, db, user)
 
 
 @router.patch(
     "/{user_id}",
     status_code=status.HTTP_200_OK,
+    response_model=UserResponse,
     description="""
 Endpoint untuk **memperbarui data pengguna** berdasarkan user ID.  
 
@@ -62,13 +70,16 @@ Jika gagal:
 - **422 Validation Error** → Format data tidak sesuai  
 """,
 )
-def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
-    return user_service.update_user(db, user, user_id)
+async def update_user(
+    user_id: int, user: UserUpdate, db: Session = Depends(get_session)
+):
+    return await run_service(user_service.update_user, db, user, user_id)
 
 
 @router.get(
     "",
     response_model=PaginatedUsers,
+    response_model_exclude_none=True,
     summary="Get all users",
     description="""
 Mengambil daftar pengguna dengan dukungan **pagination**.  
@@ -77,19 +88,38 @@ Query parameter:
 - **search** (str, optional) → Mencari pengguna berdasarkan username atau email
 - **page** (int, default=1) → Halaman yang ingin ditampilkan  
 - **per_page** (int, default=10) → Jumlah item per halaman  
+- **pagination** (page|cursor, default=page) → Mode pagination  
+- **after** (str, optional) → Cursor dari `meta.next_cursor` (mode cursor)  
+- **include_total** (bool, default=false) → Hitung total data pada mode cursor  
+- **stream** (bool, default=false) → Kirim semua data yang cocok sebagai NDJSON secara streaming, tanpa pagination  
 
 Response:
 - **200 OK** → Daftar pengguna beserta metadata pagination  
 - **401 Unauthorized** → Token tidak valid atau kedaluwarsa  
 """,
 )
-def list_users(
-    db: Session = Depends(get_db),
+async def list_users(
+    db: Session = Depends(get_session),
     search: Optional[str] = Query(None, description="Search by username or email"),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    pagination: str = Query("page", pattern="^(page|cursor)$"),
+    after: Optional[str] = Query(None, description="Cursor dari meta.next_cursor"),
+    include_total: bool = Query(False),
+    stream: bool = Query(False),
 ):
-    return user_service.list_users(db, search, page, per_page)
+    if stream:
+        return streaming_response(user_service.stream_users(search))
+    return await run_service(
+        user_service.list_users,
+        db,
+        search,
+        page,
+        per_page,
+        after,
+        pagination == "cursor",
+        include_total,
+    )
 
 
 @router.get(
@@ -107,8 +137,8 @@ Jika gagal:
 - **404 Not Found** → User dengan ID tersebut tidak ditemukan  
 """,
 )
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    return user_service.get_user(db, user_id)
+async def get_user(user_id: int, db: Session = Depends(get_session)):
+    return await run_service(user_service.get_user, db, user_id)
 
 
 @router.delete(
@@ -126,5 +156,5 @@ Jika gagal:
 - **404 Not Found** → User dengan ID tersebut tidak ditemukan  
 """,
 )
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    return user_service.delete_user(db, user_id)
+async def delete_user(user_id: int, db: Session = Depends(get_session)):
+    return await run_service(user_service.delete_user, db, user_id)
@@ -8,8 +8,27 @@ class LoginRequest(BaseModel):
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
 class TokenData(BaseModel):
     username: str | None = None
+
+
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    email: str
+    permissions: frozenset[str] = frozenset()
+
+    class Config:
+        frozen = True
@@ -1,6 +1,7 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from fastapi import Form
+from app.schemas.user import MetaData
 
 
 class BookRequest(BaseModel):
@@ -37,7 +38,31 @@ class BookResponse(BaseModel):
     title: str
     description: str
     author: str
+    status: str = "ready"
 
 
 class ShowBookResponse(BookResponse):
-    picture: str = None
+    picture: Optional[str] = None
+    pictures: Optional[Dict[str, str]] = None
+    srcset: Optional[str] = None
+
+
+class BookListItem(BookResponse):
+    picture: Optional[str] = None
+
+
+class PaginatedBooks(BaseModel):
+    data: List[BookListItem]
+    meta: MetaData
+
+
+class BulkImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class BulkImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkImportError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,37 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services import auth_service
+from app.services.user_service import get_user_by_username
+from app.services.hash_service import verify_and_update_async
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.run_sync(get_user_by_username, username)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
+        )
+    # verifikasi bcrypt di process pool agar event loop tidak terblokir
+    valid, new_hash = await verify_and_update_async(password, user.password)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
+        )
+    if new_hash:
+        await db.run_sync(
+            lambda session: auth_service.upgrade_password_hash(session, user, new_hash)
+        )
+    return user
+
+
+async def login(db: AsyncSession, username: str, password: str):
+    user = await authenticate_user(db, username, password)
+    return await db.run_sync(lambda session: auth_service.issue_tokens(user))
+
+
+async def refresh(db: AsyncSession, refresh_token: str):
+    return await db.run_sync(auth_service.refresh, refresh_token)
+
+
+async def logout(db: AsyncSession, access_payload: dict, refresh_token: str = None):
+    return await db.run_sync(auth_service.logout, access_payload, refresh_token)
@@ -0,0 +1,66 @@
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.schemas.book import BookRequest
+from app.services import book_service
+
+
+async def create_book(db: AsyncSession, data: BookRequest, picture: str):
+    return await db.run_sync(book_service.create_book, data, picture)
+
+
+async def update_book(
+    db: AsyncSession, data: BookRequest, book_id: int, picture: str = None
+):
+    return await db.run_sync(book_service.update_book, data, book_id, picture)
+
+
+async def get_book(
+    db: AsyncSession,
+    request: Request,
+    search: str,
+    page: int,
+    per_page: int,
+    after: str = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    mode: str = "substring",
+):
+    return await db.run_sync(
+        book_service.get_book,
+        request,
+        search,
+        page,
+        per_page,
+        after,
+        cursor,
+        include_total,
+        mode,
+    )
+
+
+async def show_book(book_id: int, request: Request, db: AsyncSession):
+    return await db.run_sync(
+        lambda session: book_service.show_book(book_id, request, session)
+    )
+
+
+async def delete_book(db: AsyncSession, book_id: int):
+    return await db.run_sync(book_service.delete_book, book_id)
+
+
+async def bulk_import(db: AsyncSession, file, format: str, images=None):
+    # job batch berat (zip, hash gambar, menunggu antrean) tidak boleh
+    # berjalan di event loop, jadi pakai session sync di threadpool
+    return await run_in_threadpool(
+        book_service.bulk_import_in_session, file, format, images
+    )
+
+
+def stream_books(request: Request, search: str = None, mode: str = "substring"):
+    # generator dengan session sync sendiri, sama untuk kedua mode
+    return book_service.stream_books(request, search, mode)
+
+
+def export_books(format: str):
+    return book_service.export_books(format)
@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.role import RoleRequest
+from app.services import role_service
+
+
+async def create_role(db: AsyncSession, data: RoleRequest):
+    return await db.run_sync(role_service.create_role, data)
+
+
+async def get_roles(db: AsyncSession):
+    return await db.run_sync(role_service.get_roles)
+
+
+def stream_roles():
+    # generator dengan session sync sendiri, sama untuk kedua mode
+    return role_service.stream_roles()
+
+
+async def update_role(db: AsyncSession, data: RoleRequest, role_id: int):
+    return await db.run_sync(role_service.update_role, data, role_id)
+
+
+def _get_roles_by_id(db, role_id: int):
+    role = role_service.get_roles_by_id(role_id, db)
+    if role:
+        # load relasi di dalam greenlet, bukan saat response diserialisasi
+        role.permissions
+    return role
+
+
+async def get_roles_by_id(role_id: int, db: AsyncSession):
+    return await db.run_sync(_get_roles_by_id, role_id)
+
+
+async def delete_role(db: AsyncSession, role_id: int):
+    return await db.run_sync(role_service.delete_role, role_id)
+
+
+async def assign_permission(db: AsyncSession, data, role_id: int):
+    return await db.run_sync(role_service.assign_permission, data, role_id)
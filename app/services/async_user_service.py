@@ -0,0 +1,58 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.user import UserCreate, UserUpdate
+from app.services import user_service
+from app.services.hash_service import hash_password_async
+
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await hash_password_async(user.password)
+    return await db.run_sync(user_service.create_user, user, hashed_password)
+
+
+async def update_user(db: AsyncSession, user: UserUpdate, user_id: int):
+    hashed_password = None
+    if user.password:
+        hashed_password = await hash_password_async(user.password)
+    return await db.run_sync(user_service.update_user, user, user_id, hashed_password)
+
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    return await db.run_sync(user_service.get_user_by_username, username)
+
+
+async def get_user_permissions(db: AsyncSession, username: str):
+    return await db.run_sync(user_service.get_user_permissions, username)
+
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.run_sync(user_service.get_user, user_id)
+
+
+async def list_users(
+    db: AsyncSession,
+    search: Optional[str],
+    page: int,
+    per_page: int,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+):
+    return await db.run_sync(
+        user_service.list_users,
+        search,
+        page,
+        per_page,
+        after,
+        cursor,
+        include_total,
+    )
+
+
+def stream_users(search: Optional[str] = None):
+    # generator dengan session sync sendiri, sama untuk kedua mode
+    return user_service.stream_users(search)
+
+
+async def delete_user(db: AsyncSession, user_id: int):
+    return await db.run_sync(user_service.delete_user, user_id)
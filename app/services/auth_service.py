@@ -1,15 +1,80 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
 from app.services.user_service import get_user_by_username
-from app.utils.hash import verify_password     # ganti ke utils/hash.py
-from app.core.security import create_access_token
+from app.services.hash_service import verify_and_update_async
+from app.core.config import settings
+from app.core import revocation
+from app.core.security import (
+    build_current_user,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    permission_claims,
+)
+from datetime import datetime
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
-    if not user or not verify_password(password, user.password):
+async def authenticate_user(db: Session, username: str, password: str):
+    # Hanya akses DB yang memakai threadpool; verifikasi hash di-await dari
+    # process pool, jadi login massal tidak menahan thread AnyIO selama bcrypt
+    user = await run_in_threadpool(get_user_by_username, db, username)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_async(password, user.password)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        await run_in_threadpool(upgrade_password_hash, db, user, new_hash)
     return user
 
+def upgrade_password_hash(db: Session, user, new_hash: str):
+    # Migrasi hash ke skema/cost terbaru setelah login berhasil
+    user.password = new_hash
+    db.commit()
+
 def generate_token(user):
-    return create_access_token({"sub": user.username})
+    data = {"sub": user.username}
+    if settings.JWT_EMBED_PERMISSIONS:
+        data.update(permission_claims(build_current_user(user)))
+    return create_access_token(data)
+
+
+def issue_tokens(user):
+    return {
+        "access_token": generate_token(user),
+        "refresh_token": create_refresh_token(user.username),
+        "token_type": "bearer",
+    }
+
+
+async def login(db: Session, username: str, password: str):
+    user = await authenticate_user(db, username, password)
+    return await run_in_threadpool(issue_tokens, user)
+
+
+def _revoke(db: Session, payload: dict, token_type: str) -> bool:
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    return revocation.revoke(db, payload["jti"], token_type, expires_at)
+
+
+def refresh(db: Session, refresh_token: str):
+    payload = decode_token(refresh_token, token_type="refresh")
+    # Rotasi: refresh token hanya bisa dipakai sekali, pemakaian ulang ditolak
+    if not _revoke(db, payload, "refresh"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+    user = get_user_by_username(db, payload["sub"])
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    return issue_tokens(user)
+
+
+def logout(db: Session, access_payload: dict, refresh_token: str = None):
+    if access_payload.get("jti"):
+        _revoke(db, access_payload, "access")
+    if refresh_token:
+        payload = decode_token(refresh_token, token_type="refresh")
+        if payload["sub"] != access_payload["sub"]:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        _revoke(db, payload, "refresh")
+    return {"status_code": 200, "message": "Logged out successfully"}
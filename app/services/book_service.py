@@ -1,57 +1,89 @@
+import csv
+import io
+import json
+import logging
+import zipfile
+from datetime import datetime, timedelta
 from math import ceil
-from anyio import Path
+from sqlalchemy import DateTime, delete, func, insert, select, true, update
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.orm import Session
+from app.database import SessionLocal
 from app.models.book import Book
-from app.schemas.book import BookRequest, ShowBookResponse
-from fastapi import UploadFile, HTTPException, Request
-import os
-from uuid import uuid4
-from PIL import Image
+from app.schemas.book import BookRequest
+from app.helpers.pagination import cursor_paginate
+from app.helpers.streaming import stream_rows
+from app.core.config import settings
+from app.core import response_cache
+from app.services import image_service
+from app.utils.search_index import TrigramIndex
+from fastapi import HTTPException, Request
 
-UPLOAD_DIR = Path("app/uploads/books")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+logger = logging.getLogger(__name__)
 
+search_index = TrigramIndex(settings.SEARCH_TRIGRAM_THRESHOLD)
+# waktu DB saat index terakhir diselaraskan (perubahan dari worker lain)
+_search_synced_at = None
 
-def create_book(db: Session, data: BookRequest, picture: UploadFile):
-    filename = f"{uuid4().hex}.jpg"
-    file_path = os.path.join(UPLOAD_DIR, filename)
+BULK_FIELDS = ("title", "author", "description")
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "author",
+    "description",
+    "picture",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+# buku yang belum di-soft-delete; bentuk "is_live = 1" cocok dengan predikat
+# partial index ix_books_is_live_id
+LIVE = Book.is_live == true()
+
+
+def create_book(db: Session, data: BookRequest, picture: str):
+    # picture: nama file yang sudah disimpan di staging oleh router
+    try:
+        image_service.reserve()
+    except HTTPException:
+        image_service.discard_staged(picture)
+        raise
 
     try:
-        # Simpan record di DB (tapi belum commit)
         db_data = Book(
             title=data.title,
             author=data.author,
             description=data.description,
-            picture=filename,
+            picture=picture,
+            status=image_service.STATUS_PROCESSING,
         )
         db.add(db_data)
-        db.flush()  # flush dulu biar dapat ID tapi belum commit
-
-        # Proses gambar (kompres + simpan)
-        image = Image.open(picture.file)
-        image = image.convert("RGB")
-        image.save(file_path, "JPEG", optimize=True, quality=70)
-
-        # Commit jika semua berhasil
         db.commit()
         db.refresh(db_data)
-        return db_data
-
     except Exception as e:
-        # Hapus file kalau sudah sempat dibuat
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-        # Rollback database
+        image_service.release()
+        image_service.discard_staged(picture)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to upload book: {e}")
 
+    # Proses gambar (kompres + simpan) di background worker
+    image_service.enqueue(picture)
+    search_index.add(db_data.id, f"{db_data.title} {db_data.author}")
+    response_cache.invalidate(response_cache.BOOKS)
+    return db_data
+
+
+def update_book(db: Session, data: BookRequest, book_id: int, picture: str = None):
+    if picture:
+        try:
+            image_service.reserve()
+        except HTTPException:
+            image_service.discard_staged(picture)
+            raise
 
-def update_book(
-    db: Session, data: BookRequest, book_id: int, picture: UploadFile = None
-):
     try:
-        db_data = db.query(Book).filter(Book.id == book_id).first()
+        db_data = db.query(Book).filter(Book.id == book_id, LIVE).first()
         if not db_data:
             raise HTTPException(status_code=404, detail="Book not found")
 
@@ -61,88 +93,444 @@ def update_book(
             if value:
                 setattr(db_data, field, value)
 
+        old_picture = db_data.picture
         if picture:
-            # Hapus file lama jika ada
-            if db_data.picture:
-                old_file_path = os.path.join(UPLOAD_DIR, db_data.picture)
-                if os.path.exists(old_file_path):
-                    os.remove(old_file_path)
-
-            # Proses gambar (kompres + simpan)
-            filename = f"{uuid4().hex}.jpg"
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            image = Image.open(picture.file)
-            image = image.convert("RGB")
-            image.save(file_path, "JPEG", optimize=True, quality=70)
-
-            db_data.picture = filename
+            db_data.picture = picture
+            db_data.status = image_service.STATUS_PROCESSING
+            # disimpan supaya resume_pending setelah restart tetap menghapusnya
+            db_data.previous_picture = old_picture or None
 
         db.commit()
         db.refresh(db_data)
-        return db_data
 
     except Exception as e:
         db.rollback()
         if picture:
-            file_path = os.path.join(
-                UPLOAD_DIR, f"{book_id}{os.path.splitext(picture.filename)[1]}"
-            )
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            image_service.release()
+            image_service.discard_staged(picture)
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=500, detail=f"Failed to update book: {e}")
 
+    # File lama dihapus oleh worker setelah gambar baru selesai diproses
+    if picture:
+        image_service.enqueue(picture, replaces=old_picture)
+    search_index.add(db_data.id, f"{db_data.title} {db_data.author}")
+    response_cache.invalidate(response_cache.BOOKS)
+    return db_data
 
-def get_book(db: Session, request: Request, search: str, page: int, per_page: int):
-    query = db.query(Book)
 
-    # Filter search
-    if search:
-        query = query.filter(
-            (Book.title.ilike(f"%{search}%")) | (Book.author.ilike(f"%{search}%"))
-        )
+def get_book(
+    db: Session,
+    request: Request,
+    search: str,
+    page: int,
+    per_page: int,
+    after: str = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    mode: str = "substring",
+):
+    query = db.query(Book).filter(LIVE)
+
+    if search and mode == "fulltext":
+        if cursor or after:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is not supported for fulltext search",
+            )
+        books, meta = _fulltext_search(db, query, search, page, per_page)
+    else:
+        # Filter search
+        query = _book_filter(query, search)
+
+        if cursor or after:
+            books, meta = cursor_paginate(
+                query, Book.id, per_page, after, include_total
+            )
+        else:
+            total = query.count()
+            books = query.offset((page - 1) * per_page).limit(per_page).all()
+            meta = _page_meta(total, page, per_page)
 
-    total = query.count()
-    total_pages = ceil(total / per_page) if total > 0 else 1
-    books = query.offset((page - 1) * per_page).limit(per_page).all()
     base_url = str(request.base_url) + "uploads/"
 
     data = []
     for book in books:
-        picture_url = base_url + book.picture if book.picture else None
+        picture_url = None
+        if book.picture and book.status == image_service.STATUS_READY:
+            # daftar buku memakai ukuran gambar terkecil
+            picture_url = _thumbnail_url(base_url, book.picture)
         data.append(
-            ShowBookResponse(
-                id=book.id,
-                title=book.title,
-                author=book.author,
-                description=book.description,
-                picture=picture_url,
-            )
+            {
+                "id": book.id,
+                "title": book.title,
+                "author": book.author,
+                "description": book.description,
+                "picture": picture_url,
+                "status": book.status,
+            }
         )
 
-    meta = {
+    return {"data": data, "meta": meta}
+
+
+def _page_meta(total: int, page: int, per_page: int):
+    return {
         "total": total,
         "page": page,
         "per_page": per_page,
-        "total_pages": total_pages,
+        "total_pages": ceil(total / per_page) if total > 0 else 1,
     }
 
-    return {"data": data, "meta": meta}
+
+def _fulltext_search(db: Session, query, search: str, page: int, per_page: int):
+    if db.get_bind().dialect.name == "mysql":
+        # MATCH ... AGAINST memakai FULLTEXT index, urut berdasarkan relevansi
+        relevance = match(Book.title, Book.author, against=search)
+        query = query.filter(relevance > 0)
+        total = query.count()
+        books = (
+            query.order_by(relevance.desc(), Book.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
+        return books, _page_meta(total, page, per_page)
+
+    if not search_index.loaded:
+        _load_search_index(db)
+    ids = search_index.search(search)
+    page_ids = ids[(page - 1) * per_page : page * per_page]
+    rows = {}
+    if page_ids:
+        rows = {book.id: book for book in query.filter(Book.id.in_(page_ids)).all()}
+    books = [rows[book_id] for book_id in page_ids if book_id in rows]
+    return books, _page_meta(len(ids), page, per_page)
+
+
+def _db_now(db: Session) -> datetime:
+    # jam DB, bukan jam proses: updated_at diisi oleh DB
+    return db.scalar(select(func.now(type_=DateTime)))
+
+
+def _load_search_index(db: Session):
+    global _search_synced_at
+    synced_at = _db_now(db)
+    search_index.load(
+        (book.id, f"{book.title} {book.author}")
+        for book in db.query(Book.id, Book.title, Book.author).filter(LIVE)
+    )
+    _search_synced_at = synced_at
+
+
+def sync_search_index():
+    """Selaraskan index trigram dengan buku yang diubah worker lain.
+
+    Hanya untuk non-MySQL (index dimuat saat pencarian fulltext pertama).
+    Buku baru/diubah masuk index, buku yang di-soft-delete dikeluarkan.
+    """
+    global _search_synced_at
+    since = _search_synced_at
+    if not search_index.loaded or since is None:
+        return
+    db = SessionLocal()
+    try:
+        synced_at = _db_now(db)
+        # overlap agar tidak ada yang terlewat karena commit yang terlambat
+        overlap = timedelta(seconds=settings.SEARCH_INDEX_SYNC_INTERVAL * 2)
+        rows = db.query(Book.id, Book.title, Book.author, Book.is_live).filter(
+            Book.updated_at >= since - overlap
+        )
+        for row in rows:
+            if row.is_live:
+                search_index.add(row.id, f"{row.title} {row.author}")
+            else:
+                search_index.remove(row.id)
+        _search_synced_at = synced_at
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to sync search index")
+    finally:
+        db.close()
+
+
+def _thumbnail_url(base_url: str, filename: str):
+    formats = image_service.picture_formats()
+    if not settings.BOOK_PICTURE_SIZES or not formats:
+        return base_url + filename
+    width = min(settings.BOOK_PICTURE_SIZES)
+    return base_url + image_service.derivative_name(filename, width, formats[0])
+
+
+def _picture_urls(base_url: str, filename: str):
+    urls = {"original": base_url + filename}
+    for width in sorted(settings.BOOK_PICTURE_SIZES):
+        for format_name in image_service.picture_formats():
+            name = image_service.derivative_name(filename, width, format_name)
+            urls[f"{width}.{format_name}"] = base_url + name
+    return urls
+
+
+def _srcset(base_url: str, filename: str):
+    formats = image_service.picture_formats()
+    if not formats:
+        return None
+    return ", ".join(
+        f"{base_url}{image_service.derivative_name(filename, width, formats[0])} {width}w"
+        for width in sorted(settings.BOOK_PICTURE_SIZES)
+    )
 
 
 def show_book(book_id: int, request: Request, db: Session):
-    data = db.query(Book).filter(Book.id == book_id).first()
+    data = db.query(Book).filter(Book.id == book_id, LIVE).first()
     if not data:
         raise HTTPException(status_code=404, detail="Book not found")
-    if data.picture:
+    picture_url = pictures = srcset = None
+    if data.picture and data.status == image_service.STATUS_READY:
         base_url = str(request.base_url) + "uploads/"
-        data.picture = base_url + data.picture
-    return ShowBookResponse(**data.__dict__)
+        picture_url = base_url + data.picture
+        pictures = _picture_urls(base_url, data.picture)
+        srcset = _srcset(base_url, data.picture)
+    # dict biasa, divalidasi sekali saat dirender dengan ShowBookResponse
+    return {
+        "id": data.id,
+        "title": data.title,
+        "author": data.author,
+        "description": data.description,
+        "picture": picture_url,
+        "status": data.status,
+        "pictures": pictures,
+        "srcset": srcset,
+    }
 
 
 def delete_book(db: Session, book_id: int):
-    db_data = db.query(Book).filter(Book.id == book_id).first()
-    if not db_data:
+    # soft delete: baris dan file gambar dihapus permanen oleh purge_deleted
+    result = db.execute(
+        update(Book)
+        .where(Book.id == book_id, LIVE)
+        .values(deleted_at=datetime.utcnow(), updated_at=func.now())
+    )
+    if not result.rowcount:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Book not found")
-    db.delete(db_data)
     db.commit()
+    search_index.remove(book_id)
+    response_cache.invalidate(response_cache.BOOKS)
     return {"status_code": 200, "message": "Book deleted successfully"}
+
+
+def purge_deleted():
+    """Hapus permanen buku yang sudah di-soft-delete melewati masa retensi.
+
+    Per batch: ambil id + picture, hapus barisnya dalam satu transaksi,
+    lalu hapus file gambarnya sekaligus. Mengembalikan jumlah baris terhapus.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.BOOK_PURGE_RETENTION_DAYS)
+    purged = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(Book.id, Book.picture)
+                .where(Book.deleted_at < cutoff)
+                .order_by(Book.id)
+                .limit(settings.BOOK_PURGE_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            db.execute(delete(Book).where(Book.id.in_([row.id for row in rows])))
+            db.commit()
+            # file dihapus setelah commit: jika gagal, sisa file tidak dirujuk
+            image_service.remove_pictures(row.picture for row in rows if row.picture)
+            purged += len(rows)
+            if len(rows) < settings.BOOK_PURGE_BATCH_SIZE:
+                break
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to purge deleted books")
+    finally:
+        db.close()
+    if purged:
+        logger.info("Purged %d deleted books", purged)
+    return purged
+
+
+def _bulk_rows(file, format: str):
+    # (nomor baris, dict atau pesan error), dibaca bertahap dari file
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if format == "csv":
+            # baris 1 adalah header
+            for number, row in enumerate(csv.DictReader(text), start=2):
+                yield number, row
+            return
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield number, "Invalid JSON"
+                continue
+            yield number, row if isinstance(row, dict) else "Row must be an object"
+    finally:
+        text.detach()
+
+
+def _bulk_values(row: dict, archive):
+    values = {}
+    for field in BULK_FIELDS:
+        value = str(row.get(field) or "").strip()
+        if not value:
+            raise ValueError(f"{field} is required")
+        limit = Book.__table__.c[field].type.length
+        if len(value) > limit:
+            raise ValueError(f"{field} must be at most {limit} characters")
+        values[field] = value
+
+    # kolom picture = nama file di dalam zip; kosong berarti tanpa gambar
+    name = str(row.get("picture") or "").strip()
+    values["picture"] = ""
+    values["status"] = image_service.STATUS_READY
+    if name:
+        if archive is None:
+            raise ValueError("picture requires an images archive")
+        try:
+            with archive.open(name) as member:
+                values["picture"] = image_service.stage_file(member)
+        except KeyError:
+            raise ValueError(f"{name} not found in images archive")
+        values["status"] = image_service.STATUS_PROCESSING
+    return values
+
+
+def _bulk_error(result: dict, number: int, detail: str):
+    result["failed"] += 1
+    if len(result["errors"]) < settings.BULK_MAX_ERRORS:
+        result["errors"].append({"row": number, "detail": detail})
+    else:
+        result["errors_truncated"] = True
+
+
+def _bulk_flush(db: Session, batch: list, result: dict):
+    if not batch:
+        return
+    try:
+        # satu INSERT executemany dan satu transaksi per batch
+        db.execute(insert(Book), [values for _, values in batch])
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to insert book batch")
+        for number, values in batch:
+            if values["picture"]:
+                image_service.discard_staged(values["picture"])
+            _bulk_error(result, number, "Failed to insert row")
+        return
+
+    result["inserted"] += len(batch)
+    for _, values in batch:
+        if values["picture"]:
+            # tunggu slot antrean, bukan menolak seperti upload satuan
+            image_service.reserve(blocking=True)
+            image_service.enqueue(values["picture"])
+
+
+def bulk_import(db: Session, file, format: str, images=None):
+    try:
+        archive = zipfile.ZipFile(images) if images else None
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Images must be a zip archive")
+
+    result = {"inserted": 0, "failed": 0, "errors": []}
+    batch = []
+    try:
+        for number, row in _bulk_rows(file, format):
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                values = _bulk_values(row, archive)
+            except ValueError as e:
+                _bulk_error(result, number, str(e))
+                continue
+            except HTTPException as e:
+                _bulk_error(result, number, e.detail)
+                continue
+            batch.append((number, values))
+            if len(batch) >= settings.BULK_BATCH_SIZE:
+                _bulk_flush(db, batch, result)
+                batch = []
+        _bulk_flush(db, batch, result)
+    except UnicodeDecodeError:
+        for _, values in batch:
+            if values["picture"]:
+                image_service.discard_staged(values["picture"])
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    finally:
+        if archive is not None:
+            archive.close()
+        if result["inserted"]:
+            # id hasil executemany tidak dikembalikan, index dibangun ulang
+            search_index.reset()
+            response_cache.invalidate(response_cache.BOOKS)
+
+    return result
+
+
+def bulk_import_in_session(file, format: str, images=None):
+    db = SessionLocal()
+    try:
+        return bulk_import(db, file, format, images)
+    finally:
+        db.close()
+
+
+def _book_filter(statement, search: str):
+    if search:
+        statement = statement.where(
+            (Book.title.ilike(f"%{search}%")) | (Book.author.ilike(f"%{search}%"))
+        )
+    return statement
+
+
+def stream_books(request: Request, search: str = None, mode: str = "substring"):
+    if search and mode == "fulltext":
+        raise HTTPException(
+            status_code=400,
+            detail="Streaming is not supported for fulltext search",
+        )
+    statement = _book_filter(
+        select(
+            Book.id,
+            Book.title,
+            Book.author,
+            Book.description,
+            Book.picture,
+            Book.status,
+        )
+        .where(LIVE)
+        .order_by(Book.id),
+        search,
+    )
+    base_url = str(request.base_url) + "uploads/"
+
+    def serialize(row):
+        item = row._asdict()
+        picture = item.pop("picture")
+        item["picture"] = None
+        if picture and row.status == image_service.STATUS_READY:
+            item["picture"] = _thumbnail_url(base_url, picture)
+        return item
+
+    return stream_rows(statement, serialize)
+
+
+def export_books(format: str):
+    statement = (
+        select(*(Book.__table__.c[field] for field in EXPORT_FIELDS))
+        .where(LIVE)
+        .order_by(Book.id)
+    )
+    return stream_rows(statement, lambda row: row._asdict(), format, EXPORT_FIELDS)
@@ -0,0 +1,137 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core import request_stats
+from app.core.metrics import Counter, Gauge, Histogram, register_collector
+from app.utils import hash as hash_utils
+
+HASH_LATENCY = Histogram(
+    "password_hash_seconds",
+    "Waktu hash/verify password termasuk antrean",
+    labelnames=("operation",),
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5, 10),
+)
+HASH_QUEUE = Gauge(
+    "password_hash_queue",
+    "Jumlah job hash password yang sedang berjalan/antre",
+)
+HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Job hash password yang ditolak karena antrean penuh",
+    labelnames=("operation",),
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.HASH_QUEUE_SIZE)
+_inflight = 0
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reserve(operation: str):
+    global _inflight
+    if not _slots.acquire(blocking=False):
+        HASH_REJECTED.inc(operation=operation)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+    with _pool_lock:
+        _inflight += 1
+
+
+def _release(_future=None):
+    global _inflight
+    with _pool_lock:
+        _inflight -= 1
+    _slots.release()
+
+
+def _submit(operation: str, func, *args):
+    # Slot dilepas saat job selesai, bukan saat pemanggil berhenti menunggu
+    _reserve(operation)
+    try:
+        future = _get_pool().submit(func, *args)
+    except Exception:
+        _release()
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+def _run(operation: str, func, *args):
+    started = time.perf_counter()
+    if settings.HASH_WORKERS <= 0:
+        result = func(*args)
+    else:
+        result = _submit(operation, func, *args).result()
+    elapsed = time.perf_counter() - started
+    HASH_LATENCY.observe(elapsed, operation=operation)
+    request_stats.record("hash", elapsed)
+    return result
+
+
+async def _run_async(operation: str, func, *args):
+    started = time.perf_counter()
+    if settings.HASH_WORKERS <= 0:
+        # tanpa process pool, jangan blok event loop
+        result = await run_in_threadpool(func, *args)
+    else:
+        result = await asyncio.wrap_future(_submit(operation, func, *args))
+    elapsed = time.perf_counter() - started
+    HASH_LATENCY.observe(elapsed, operation=operation)
+    request_stats.record("hash", elapsed)
+    return result
+
+
+def hash_password(password: str) -> str:
+    return _run("hash", hash_utils.hash_password, password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return _run("verify", hash_utils.verify_password, password, hashed)
+
+
+def verify_and_update(password: str, hashed: str):
+    return _run("verify", hash_utils.verify_and_update, password, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async("hash", hash_utils.hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run_async("verify", hash_utils.verify_password, password, hashed)
+
+
+async def verify_and_update_async(password: str, hashed: str):
+    return await _run_async("verify", hash_utils.verify_and_update, password, hashed)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+@register_collector
+def _collect_queue():
+    HASH_QUEUE.set(_inflight)
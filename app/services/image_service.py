@@ -0,0 +1,427 @@
+import glob
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import suppress
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from uuid import uuid4
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, features
+from app.core.config import settings
+from app.core import process_lock, request_stats, response_cache
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PROCESS_SECONDS = Histogram(
+    "image_process_seconds",
+    "Waktu Pillow memproses gambar di worker (decode, kompres, derivative)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+UPLOAD_DIR = os.path.abspath("app/uploads/books")
+STAGING_DIR = os.path.abspath("app/uploads/staging")
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(STAGING_DIR, exist_ok=True)
+
+CHUNK_SIZE = 1024 * 1024
+
+STATUS_PROCESSING = "processing"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+# format derivative -> (format Pillow, ekstensi file, opsi encoder)
+FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"optimize": True, "quality": 70, "progressive": True}),
+    "webp": ("WEBP", "webp", {"quality": 70, "method": 4}),
+    "avif": ("AVIF", "avif", {"quality": 55}),
+}
+
+_pool = None
+# update status buku dijalankan di satu thread, bukan di thread callback pool
+_status_executor = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.IMAGE_QUEUE_SIZE)
+
+
+def staging_path(filename: str) -> str:
+    return os.path.join(STAGING_DIR, f"{os.path.splitext(filename)[0]}.upload")
+
+
+def sniff_image(header: bytes):
+    # cek magic bytes, jangan percaya Content-Type dari client
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def stage_upload(picture: UploadFile) -> str:
+    return stage_file(picture.file)
+
+
+def stage_file(fileobj) -> str:
+    # Simpan file mentah ke staging per chunk, diproses nanti oleh worker
+    tmp_path = os.path.join(STAGING_DIR, f"{uuid4().hex}.part")
+    try:
+        size = 0
+        digest = hashlib.sha256()
+        with open(tmp_path, "wb") as buffer:
+            while chunk := fileobj.read(CHUNK_SIZE):
+                if size == 0 and sniff_image(chunk[:12]) is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Only images are allowed",
+                    )
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail="Image is too large",
+                    )
+                digest.update(chunk)
+                buffer.write(chunk)
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only images are allowed",
+            )
+        check_dimensions(tmp_path)
+        return _claim_staging(tmp_path, digest.hexdigest()[:32])
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _claim_staging(tmp_path: str, content_hash: str) -> str:
+    # Nama file = hash konten, sehingga URL immutable dan aman di-cache selamanya.
+    # Jika nama sudah dipakai (upload yang sama), tambahkan suffix acak agar
+    # file tidak pernah dipakai bersama oleh dua buku.
+    for stem in (content_hash, f"{content_hash}_{uuid4().hex[:8]}"):
+        filename = f"{stem}.jpg"
+        if os.path.exists(os.path.join(UPLOAD_DIR, filename)):
+            continue
+        try:
+            fd = os.open(staging_path(filename), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        os.replace(tmp_path, staging_path(filename))
+        return filename
+    raise HTTPException(status_code=500, detail="Failed to store picture")
+
+
+def check_dimensions(path: str):
+    # Image.open hanya membaca header, belum decode pixel
+    try:
+        with request_stats.measure("image"), Image.open(path) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        # > 2x Image.MAX_IMAGE_PIXELS Pillow, ditolak sebelum cek di bawah
+        raise dimensions_too_large()
+    except (OSError, SyntaxError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file"
+        )
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise dimensions_too_large()
+
+
+def dimensions_too_large():
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail="Image dimensions are too large",
+    )
+
+
+def discard_staged(filename: str):
+    path = staging_path(filename)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+@lru_cache(maxsize=None)
+def picture_formats() -> tuple:
+    # format yang tidak didukung build Pillow (mis. avif) dilewati
+    return tuple(
+        name
+        for name in settings.BOOK_PICTURE_FORMATS
+        if name in FORMATS and (name == "jpeg" or features.check(name))
+    )
+
+
+def derivative_name(filename: str, width: int, format_name: str) -> str:
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}-{width}.{FORMATS[format_name][1]}"
+
+
+def remove_picture(filename: str):
+    stem = os.path.splitext(filename)[0]
+    paths = [os.path.join(UPLOAD_DIR, filename)]
+    paths += glob.glob(os.path.join(UPLOAD_DIR, glob.escape(stem) + "-*"))
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def remove_pictures(filenames):
+    """Hapus banyak gambar (asli + semua derivative) dengan satu scan direktori."""
+    stems = {os.path.splitext(filename)[0] for filename in filenames}
+    if not stems:
+        return
+    for filename in stems:
+        discard_staged(filename)
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            # <stem>.jpg atau <stem>-<width>.<ext>; stem tidak mengandung "-"
+            stem = os.path.splitext(entry.name)[0].split("-", 1)[0]
+            if stem in stems:
+                with suppress(FileNotFoundError):
+                    os.remove(entry.path)
+
+
+def _save(image, destination: str, format_name: str):
+    pil_format, _, options = FORMATS[format_name]
+    # tmp per proses: job duplikat (resume) tidak saling menimpa file setengah jadi
+    tmp_path = f"{destination}.{os.getpid()}.tmp"
+    image.save(tmp_path, pil_format, **options)
+    os.replace(tmp_path, destination)
+
+
+def build_derivatives(image, destination: str, widths, formats):
+    # dari ukuran terbesar ke terkecil, tiap thumbnail dibuat dari hasil sebelumnya
+    directory, filename = os.path.split(destination)
+    for width in sorted(widths, reverse=True):
+        if image.width > width:
+            image = image.copy()
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        for format_name in formats:
+            path = os.path.join(
+                directory, derivative_name(filename, width, format_name)
+            )
+            _save(image, path, format_name)
+
+
+def process_picture(
+    source: str,
+    destination: str,
+    widths=(),
+    formats=(),
+    max_pixels: int = None,
+    max_dimension: int = None,
+):
+    # Dijalankan di process pool: decode, convert, kompres + derivative.
+    # Mengembalikan durasi (detik) untuk metrics di proses utama.
+    started = time.perf_counter()
+    if max_pixels:
+        Image.MAX_IMAGE_PIXELS = max_pixels
+    image = Image.open(source)
+    if max_dimension:
+        # JPEG bisa di-decode langsung ke skala kecil, hemat memory
+        image.draft("RGB", (max_dimension, max_dimension))
+    image = image.convert("RGB")
+    if max_dimension and max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    _save(image, destination, "jpeg")
+    build_derivatives(image, destination, widths, formats)
+    # sudah dihapus oleh job duplikat yang selesai lebih dulu
+    with suppress(FileNotFoundError):
+        os.remove(source)
+    return time.perf_counter() - started
+
+
+def process_existing_picture(destination: str, widths=(), formats=()):
+    with Image.open(destination) as image:
+        build_derivatives(image.convert("RGB"), destination, widths, formats)
+
+
+def _get_pool():
+    global _pool, _status_executor
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=settings.IMAGE_WORKER_MAX_TASKS,
+            )
+            _status_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="image-status"
+            )
+        return _pool
+
+
+def reserve(blocking: bool = False):
+    # blocking=True untuk job batch (bulk import) yang boleh menunggu antrean
+    if not _slots.acquire(blocking=blocking):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Image processing queue is full",
+        )
+
+
+def release():
+    _slots.release()
+
+
+def enqueue(filename: str, replaces: str = None):
+    # slot harus sudah diambil lewat reserve()
+    try:
+        future = _get_pool().submit(
+            process_picture,
+            staging_path(filename),
+            os.path.join(UPLOAD_DIR, filename),
+            settings.BOOK_PICTURE_SIZES,
+            picture_formats(),
+            settings.MAX_IMAGE_PIXELS,
+            settings.MAX_PICTURE_DIMENSION,
+        )
+    except Exception:
+        release()
+        raise
+    future.add_done_callback(
+        lambda done: _status_executor.submit(_finish, filename, replaces, done)
+    )
+
+
+def _update_books(filename: str, values: dict, pending_only: bool = False):
+    from app.database import SessionLocal
+    from app.models.book import Book
+
+    db = SessionLocal()
+    try:
+        query = db.query(Book).filter(Book.picture == filename)
+        if pending_only:
+            query = query.filter(Book.status == STATUS_PROCESSING)
+        query.update(values, synchronize_session=False)
+        db.commit()
+        # status/gambar berubah, response buku yang di-cache sudah basi
+        response_cache.invalidate(response_cache.BOOKS)
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to update status for picture %s", filename)
+    finally:
+        db.close()
+
+
+def _picture_in_use(filename: str) -> bool:
+    from app.database import SessionLocal
+    from app.models.book import Book
+
+    db = SessionLocal()
+    try:
+        return db.query(Book.id).filter(Book.picture == filename).first() is not None
+    finally:
+        db.close()
+
+
+def _finish(filename: str, replaces: str, future):
+    release()
+    error = future.exception()
+    if error is None:
+        IMAGE_PROCESS_SECONDS.observe(future.result())
+        _update_books(filename, {"status": STATUS_READY, "previous_picture": None})
+        # gambar lama bisa sudah dikembalikan oleh job duplikat yang gagal
+        if replaces and not _picture_in_use(replaces):
+            remove_picture(replaces)
+        return
+
+    logger.error("Failed to process picture %s: %s", filename, error)
+    discard_staged(filename)
+    _fail(filename, replaces)
+
+
+def _fail(filename: str, replaces: str):
+    # hanya buku yang masih menunggu gambar ini, job duplikat yang kalah tidak
+    # boleh menimpa buku yang sudah ready
+    if replaces:
+        # gagal memproses gambar baru, kembalikan gambar lama
+        values = {"picture": replaces, "status": STATUS_READY}
+    else:
+        values = {"status": STATUS_FAILED}
+    _update_books(filename, {**values, "previous_picture": None}, pending_only=True)
+
+
+def resume_pending():
+    # Lanjutkan gambar yang belum selesai diproses sebelum restart. Staging ada
+    # di disk lokal, jadi cukup satu worker per host yang menjalankannya.
+    if not process_lock.acquire("image-resume"):
+        return
+
+    from app.database import SessionLocal
+    from app.models.book import Book
+
+    db = SessionLocal()
+    try:
+        pending = db.query(Book.picture, Book.previous_picture).filter(
+            Book.status == STATUS_PROCESSING
+        )
+        rows = pending.all()
+    finally:
+        db.close()
+
+    for filename, replaces in rows:
+        if os.path.exists(staging_path(filename)):
+            _slots.acquire()
+            enqueue(filename, replaces=replaces)
+        else:
+            _fail(filename, replaces)
+
+
+def shutdown():
+    global _pool, _status_executor
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _status_executor.shutdown(wait=True)
+            _pool = _status_executor = None
+
+
+def backfill_derivatives():
+    # Buat derivative untuk gambar lama yang belum punya (mis. setelah ubah ukuran)
+    from app.database import SessionLocal
+    from app.models.book import Book
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Book.picture).filter(
+            Book.status == STATUS_READY, Book.deleted_at.is_(None)
+        )
+        filenames = [filename for (filename,) in rows if filename]
+    finally:
+        db.close()
+
+    formats = picture_formats()
+    futures = []
+    for filename in filenames:
+        destination = os.path.join(UPLOAD_DIR, filename)
+        missing = any(
+            not os.path.exists(
+                os.path.join(UPLOAD_DIR, derivative_name(filename, width, format_name))
+            )
+            for width in settings.BOOK_PICTURE_SIZES
+            for format_name in formats
+        )
+        if missing and os.path.exists(destination):
+            futures.append(
+                _get_pool().submit(
+                    process_existing_picture,
+                    destination,
+                    settings.BOOK_PICTURE_SIZES,
+                    formats,
+                )
+            )
+    for future in futures:
+        future.result()
+    shutdown()
+    print(f"Backfilled derivatives for {len(futures)} pictures")
+
+
+if __name__ == "__main__":
+    backfill_derivatives()
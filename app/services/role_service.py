@@ -1,7 +1,12 @@
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.orm import Session
 from app.models.role import Role, Permission
 from app.schemas.role import RoleRequest
+from app.core import permission_cache
+from app.helpers.streaming import stream_rows
 
 
 def create_role(db: Session, data: RoleRequest):
@@ -16,12 +21,19 @@ def get_roles(db: Session):
     return db.query(Role).all()
 
 
+def stream_roles():
+    statement = select(Role.id, Role.name).order_by(Role.id)
+    return stream_rows(statement, lambda row: row._asdict())
+
+
 def update_role(db: Session, data: RoleRequest, role_id: int):
     db_data = db.query(Role).filter(Role.id == role_id).first()
     if not db_data:
         raise HTTPException(status_code=404, detail="Role not found")
     db_data.name = data.name
+    version = permission_cache.bump(db)
     db.commit()
+    permission_cache.clear(version)
     db.refresh(db_data)
     return db_data
 
@@ -38,7 +50,9 @@ def delete_role(db: Session, role_id: int):
     role.permissions = []
 
     db.delete(role)
+    version = permission_cache.bump(db)
     db.commit()
+    permission_cache.clear(version)
     return {
         "status_code": status.HTTP_200_OK,
         "message": f"Role '{role.name}' deleted successfully",
@@ -46,7 +60,8 @@ def delete_role(db: Session, role_id: int):
 
 
 def assign_permission(db: Session, data, role_id: int):
-    role = db.query(Role).filter(Role.id == role_id).first()
+    # Kunci baris role supaya assign paralel ke role yang sama berjalan bergantian
+    role = db.query(Role).filter(Role.id == role_id).with_for_update().first()
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
 
@@ -60,7 +75,17 @@ def assign_permission(db: Session, data, role_id: int):
     # Hapus semua permission lama, ganti dengan baru
     role.permissions = permissions
 
-    db.commit()
+    try:
+        version = permission_cache.bump(db)
+        db.commit()
+    except (IntegrityError, StaleDataError):
+        # DB tanpa row lock (mis. SQLite): role diubah request lain bersamaan
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Role was modified concurrently, please retry",
+        )
+    permission_cache.clear(version)
     db.refresh(role)
     return {
         "status_code": status.HTTP_200_OK,
@@ -1,15 +1,22 @@
 from math import ceil
 from fastapi import HTTPException
 from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.utils.hash import hash_password
+from app.models.role import Permission, role_permissions, user_roles
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.hash_service import hash_password
+from app.helpers.pagination import cursor_paginate
+from app.helpers.streaming import stream_rows
+from app.core import permission_cache
 
 
-def create_user(db: Session, user: UserCreate):
+def create_user(db: Session, user: UserCreate, hashed_password: str = None):
     db_user = User(
-        username=user.username, email=user.email, password=hash_password(user.password)
+        username=user.username,
+        email=user.email,
+        password=hashed_password or hash_password(user.password),
     )
     db.add(db_user)
     db.commit()
@@ -17,62 +24,100 @@ def create_user(db: Session, user: UserCreate):
     return db_user
 
 
-def update_user(db: Session, user: UserUpdate, user_id: int):
+def update_user(
+    db: Session, user: UserUpdate, user_id: int, hashed_password: str = None
+):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="data not found")
     updates = {
         "username": str(user.username).capitalize() if user.username else None,
         "email": user.email,
-        "password": hash_password(user.password) if user.password else None,
+        "password": (
+            hashed_password or hash_password(user.password) if user.password else None
+        ),
     }
 
     for field, value in updates.items():
         if value is not None:
             setattr(db_user, field, value)
+    version = permission_cache.bump(db)
     db.commit()
+    permission_cache.clear(version)
     db.refresh(db_user)
     return db_user
 
 
 def get_user_by_username(db: Session, username: str):
-    data = db.query(User).filter(User.username == username).first()
-    if not data:
-        raise HTTPException(status_code=404, detail="data not found")
-    return data
+    return db.query(User).filter(User.username == username).first()
+
+
+def get_user_permissions(db: Session, username: str):
+    # Satu SELECT join tanpa hidrasi objek ORM; None jika user tidak ada
+    rows = db.execute(
+        select(User.id, User.email, Permission.name)
+        .outerjoin(user_roles, user_roles.c.user_id == User.id)
+        .outerjoin(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+        .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+        .where(User.username == username)
+        .distinct()
+    ).all()
+    if not rows:
+        return None
+    return {
+        "id": rows[0].id,
+        "email": rows[0].email,
+        "permissions": frozenset(row.name for row in rows if row.name is not None),
+    }
 
 
 def get_user(db: Session, user_id: int):
     data = db.query(User).filter(User.id == user_id).first()
     if not data:
         raise HTTPException(status_code=404, detail="data not found")
-    return UserResponse(**data.__dict__)
+    return data
 
 
-def list_users(db: Session, search: Optional[str], page: int, per_page: int):
+def list_users(
+    db: Session,
+    search: Optional[str],
+    page: int,
+    per_page: int,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+):
     query = db.query(User)
     if search:
         query = query.filter(
             User.username.contains(search) | User.email.contains(search)
         )
 
-    total = query.count()
-    total_pages = ceil(total / per_page) if total > 0 else 1
+    if cursor or after:
+        users, meta = cursor_paginate(query, User.id, per_page, after, include_total)
+    else:
+        total = query.count()
+        total_pages = ceil(total / per_page) if total > 0 else 1
 
-    users = query.offset((page - 1) * per_page).limit(per_page).all()
+        users = query.offset((page - 1) * per_page).limit(per_page).all()
+        meta = {
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages,
+        }
 
-    data = []
-    for user in users:
-        data.append(UserResponse(id=user.id, username=user.username, email=user.email))
+    # row ORM langsung, divalidasi sekali oleh response_model PaginatedUsers
+    return {"data": users, "meta": meta}
 
-    meta = {
-        "total": total,
-        "page": page,
-        "per_page": per_page,
-        "total_pages": total_pages,
-    }
 
-    return {"data": data, "meta": meta}
+def stream_users(search: Optional[str] = None):
+    statement = select(User.id, User.username, User.email).order_by(User.id)
+    if search:
+        statement = statement.where(
+            User.username.contains(search) | User.email.contains(search)
+        )
+    return stream_rows(statement, lambda row: row._asdict())
 
 
 def delete_user(db: Session, user_id: int):
@@ -80,5 +125,7 @@ def delete_user(db: Session, user_id: int):
     if not db_user:
         raise HTTPException(status_code=404, detail="data not found")
     db.delete(db_user)
+    version = permission_cache.bump(db)
     db.commit()
+    permission_cache.clear(version)
     return {"status_code": 200, "message": "data deleted"}
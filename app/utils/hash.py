@@ -1,9 +1,37 @@
 from passlib.context import CryptContext
+from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Opsi cost per skema; hash yang tidak sesuai akan di-rehash saat login
+SCHEME_OPTIONS = {
+    "bcrypt": {
+        "rounds": settings.BCRYPT_ROUNDS,
+        "min_rounds": settings.BCRYPT_ROUNDS,
+        "max_rounds": settings.BCRYPT_ROUNDS,
+    },
+    "argon2": {
+        "type": "ID",
+        "memory_cost": settings.ARGON2_MEMORY_COST,
+        "time_cost": settings.ARGON2_TIME_COST,
+        "parallelism": settings.ARGON2_PARALLELISM,
+    },
+}
+
+pwd_context = CryptContext(
+    schemes=settings.PASSWORD_SCHEMES,
+    deprecated="auto",
+    **{
+        f"{scheme}__{key}": value
+        for scheme in settings.PASSWORD_SCHEMES
+        for key, value in SCHEME_OPTIONS.get(scheme, {}).items()
+    },
+)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
+
+def verify_and_update(password: str, hashed: str):
+    # (valid, hash baru atau None jika tidak perlu migrasi)
+    return pwd_context.verify_and_update(password, hashed)
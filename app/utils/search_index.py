@@ -0,0 +1,83 @@
+import re
+import threading
+from collections import defaultdict
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(text: str) -> set:
+    # padding per kata seperti pg_trgm, agar query pendek tetap punya trigram
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index trigram in-process, fallback search untuk non-MySQL."""
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self.loaded = False
+        self._lock = threading.RLock()
+        self._postings = defaultdict(set)
+        self._documents = {}
+
+    def load(self, documents):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            for doc_id, text in documents:
+                self._add(doc_id, text)
+            self.loaded = True
+
+    def _add(self, doc_id, text: str):
+        grams = trigrams(text)
+        self._documents[doc_id] = grams
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+
+    def _remove(self, doc_id):
+        for gram in self._documents.pop(doc_id, ()):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def add(self, doc_id, text: str):
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(doc_id)
+            self._add(doc_id, text)
+
+    def reset(self):
+        # dimuat ulang dari DB pada pencarian berikutnya
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self.loaded = False
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def search(self, query: str) -> list:
+        grams = trigrams(query)
+        if not grams:
+            return []
+        scores = defaultdict(int)
+        with self._lock:
+            for gram in grams:
+                for doc_id in self._postings.get(gram, ()):
+                    scores[doc_id] += 1
+        minimum = len(grams) * self.threshold
+        ranked = [
+            (count / len(grams), doc_id)
+            for doc_id, count in scores.items()
+            if count >= minimum
+        ]
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return [doc_id for _, doc_id in ranked]
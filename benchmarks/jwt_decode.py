@@ -0,0 +1,79 @@
+"""Micro-benchmark biaya decode JWT per request.
+
+Membandingkan verifikasi penuh (python-jose dan PyJWT) dengan jalur
+decode_token aplikasi saat cache klaim kosong (miss) dan terisi (hit).
+
+Contoh:
+    python -m benchmarks.jwt_decode --iterations 20000
+"""
+
+import argparse
+import json
+import timeit
+
+from jose import jwt as jose_jwt
+
+from app.core import claims_cache
+from app.core.config import settings
+from app.core.security import create_access_token, decode_token
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT opsional
+    pyjwt = None
+
+
+def per_call_us(func, iterations: int, repeat: int) -> float:
+    best = min(timeit.repeat(func, number=iterations, repeat=repeat))
+    return round(best / iterations * 1_000_000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    token = create_access_token(
+        {"sub": "admin", "uid": 1, "email": "admin@example.com", "perms": ["a", "b"]}
+    )
+    secret, algorithms = settings.JWT_SECRET, [settings.JWT_ALGORITHM]
+
+    def cold():
+        claims_cache.clear()
+        decode_token(token)
+
+    results = {
+        "jose_decode": per_call_us(
+            lambda: jose_jwt.decode(token, secret, algorithms=algorithms),
+            args.iterations,
+            args.repeat,
+        ),
+        "decode_token_miss": per_call_us(cold, args.iterations, args.repeat),
+    }
+    if pyjwt is not None:
+        results["pyjwt_decode"] = per_call_us(
+            lambda: pyjwt.decode(token, secret, algorithms=algorithms),
+            args.iterations,
+            args.repeat,
+        )
+    decode_token(token)
+    results["decode_token_hit"] = per_call_us(
+        lambda: decode_token(token), args.iterations, args.repeat
+    )
+
+    print(
+        json.dumps(
+            {
+                "backend": settings.JWT_BACKEND,
+                "algorithm": settings.JWT_ALGORITHM,
+                "cache_size": settings.JWT_CLAIMS_CACHE_SIZE,
+                "us_per_call": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
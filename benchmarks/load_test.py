@@ -0,0 +1,376 @@
+"""Load test end-to-end untuk API.
+
+Menjalankan app.main:app dengan uvicorn di direktori kerja sementara
+(database SQLite baru, atau --database-url untuk MySQL kosong), mengisi data
+lewat seeder.py, lalu menjalankan tiap skenario berurutan dan mencetak hasil
+JSON: latency p50/p90/p99, RPS, dan jumlah query per request (dibaca dari
+header Server-Timing).
+
+Contoh:
+    python -m benchmarks.load_test --books 5000 --users 200 --roles 20
+    python -m benchmarks.load_test --scenarios login,books_list \\
+        --concurrency 32 --requests 1000 --output before.json
+    python -m benchmarks.load_test --env DB_ASYNC=true --env HASH_WORKERS=4
+    python -m benchmarks.load_test --scenarios books_list --response-cache memory
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import suppress
+
+import httpx
+from PIL import Image
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PER_PAGE = 20
+PASSWORD = "password"
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+# nilai minimal supaya Settings bisa dibuat tanpa .env
+BASE_ENV = {
+    "DB_USER": "bench",
+    "DB_PASSWORD": "bench",
+    "DB_HOST": "localhost",
+    "DB_PORT": "3306",
+    "DB_NAME": "bench",
+    "JWT_SECRET": "benchmark-secret",
+    "JWT_ALGORITHM": "HS256",
+}
+
+SCENARIOS = {}
+
+
+def scenario(name: str):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+
+    return register
+
+
+class State:
+    def __init__(self, args, token: str):
+        self.users = args.users
+        self.roles = args.roles
+        self.books = args.books
+        self.pages = max(1, -(-args.books // PER_PAGE))
+        self.auth = {"Authorization": f"Bearer {token}"}
+        self.permission_ids = [1, 2, 3]
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 1200), (200, 120, 40)).save(buffer, "JPEG")
+        self.cover = buffer.getvalue()
+
+
+@scenario("login")
+async def login(client, state, rng):
+    username = f"user{rng.randint(1, state.users)}" if state.users else "admin"
+    return await client.post(
+        "/auth/login", json={"username": username, "password": PASSWORD}
+    )
+
+
+@scenario("books_list")
+async def books_list(client, state, rng):
+    params = {"page": rng.randint(1, state.pages), "per_page": PER_PAGE}
+    return await client.get("/books", params=params, headers=state.auth)
+
+
+@scenario("books_deep_page")
+async def books_deep_page(client, state, rng):
+    # 10% halaman terakhir, OFFSET besar
+    first = max(1, state.pages - state.pages // 10)
+    params = {"page": rng.randint(first, state.pages), "per_page": PER_PAGE}
+    return await client.get("/books", params=params, headers=state.auth)
+
+
+@scenario("books_search")
+async def books_search(client, state, rng):
+    params = {
+        "search": f"Book {rng.randint(1, max(1, state.books))}",
+        "page": 1,
+        "per_page": PER_PAGE,
+    }
+    return await client.get("/books", params=params, headers=state.auth)
+
+
+@scenario("cover_upload")
+async def cover_upload(client, state, rng):
+    return await client.post(
+        "/books",
+        headers=state.auth,
+        data={"title": "Bench", "author": "Bench", "description": "load test"},
+        files={"picture": ("cover.jpg", state.cover, "image/jpeg")},
+    )
+
+
+@scenario("role_reassign")
+async def role_reassign(client, state, rng):
+    # role 1 = Admin (dipakai token benchmark), jangan diubah
+    role_id = rng.randint(2, state.roles + 1)
+    permission_ids = rng.sample(
+        state.permission_ids, rng.randint(1, len(state.permission_ids))
+    )
+    return await client.post(
+        f"/roles/{role_id}/permission",
+        headers=state.auth,
+        json={"permission_ids": permission_ids},
+    )
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def run_scenario(client, name: str, state, args) -> dict:
+    func = SCENARIOS[name]
+    rng = random.Random(args.seed)
+    for _ in range(args.warmup):
+        with suppress(httpx.TransportError):
+            await func(client, state, rng)
+
+    latencies, queries, db_ms, statuses = [], [], [], {}
+    remaining = args.requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await func(client, state, rng)
+            except httpx.TransportError:
+                # server menutup koneksi (mis. setelah unhandled error 500)
+                statuses["transport_error"] = statuses.get("transport_error", 0) + 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            code = str(response.status_code)
+            statuses[code] = statuses.get(code, 0) + 1
+            match = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+            if match:
+                db_ms.append(float(match.group(1)))
+                queries.append(int(match.group(2)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(round(value, 2) for value in latencies)
+    queries.sort()
+    return {
+        "requests": sum(statuses.values()),
+        "errors": sum(n for code, n in statuses.items() if not code.startswith("2")),
+        "status": dict(sorted(statuses.items())),
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+        "queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "p99": percentile(queries, 99),
+        },
+        "db_ms_mean": round(sum(db_ms) / len(db_ms), 3) if db_ms else None,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_env(args, workdir: str) -> dict:
+    env = {**BASE_ENV, **os.environ, "SERVER_TIMING_HEADER": "true"}
+    # default tanpa response cache: skenario list/deep page mengukur query DB,
+    # bukan cache hit setelah warmup
+    env["RESPONSE_CACHE_BACKEND"] = args.response_cache
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])
+    )
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+        env["ASYNC_DATABASE_URL"] = args.async_database_url or ""
+    else:
+        path = os.path.join(workdir, "bench.db")
+        env["DATABASE_URL"] = f"sqlite:///{path}"
+        env["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def seed_database(args, workdir: str, env: dict):
+    command = [
+        sys.executable,
+        os.path.join(REPO_DIR, "seeder.py"),
+        "--create-schema",
+        f"--users={args.users}",
+        f"--roles={args.roles}",
+        f"--books={args.books}",
+        f"--images={args.images}",
+    ]
+    subprocess.run(command, cwd=workdir, env=env, check=True, stdout=sys.stderr)
+
+
+def start_server(args, workdir: str, env: dict, port: int):
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host=127.0.0.1",
+        f"--port={port}",
+        f"--workers={args.workers}",
+        "--log-level=warning",
+        "--no-access-log",
+    ]
+    process = subprocess.Popen(command, cwd=workdir, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/openapi.json").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 60s")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_all(args, port: int) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+    ) as client:
+        response = await client.post(
+            "/auth/login", json={"username": "admin", "password": PASSWORD}
+        )
+        response.raise_for_status()
+        state = State(args, response.json()["access_token"])
+
+        results = {}
+        for name in args.scenarios:
+            if name == "role_reassign" and not args.roles:
+                results[name] = {"skipped": "butuh --roles > 0"}
+                continue
+            print(f"running {name} ...", file=sys.stderr)
+            results[name] = await run_scenario(client, name, state, args)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Daftar skenario, dipisah koma ({','.join(SCENARIOS)})",
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="Worker uvicorn")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--roles", type=int, default=10)
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--images", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--response-cache",
+        choices=("none", "memory", "redis"),
+        default="none",
+        help="Backend response cache server (default: none)",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="URL database kosong (default: SQLite baru di direktori sementara)",
+    )
+    parser.add_argument("--async-database-url")
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override setting aplikasi, boleh diulang",
+    )
+    parser.add_argument("--output", help="Simpan hasil JSON ke file")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # direktori kerja sementara: .env repo tidak terbaca dan upload tidak
+    # mengotori app/uploads
+    workdir = tempfile.mkdtemp(prefix="fastapi-bench-")
+    env = build_env(args, workdir)
+    process = None
+    try:
+        seed_database(args, workdir, env)
+        port = free_port()
+        process = start_server(args, workdir, env, port)
+        scenarios = asyncio.run(run_all(args, port))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "database": env["DATABASE_URL"].split(":", 1)[0],
+        "dataset": {
+            "users": args.users,
+            "roles": args.roles,
+            "books": args.books,
+            "images": args.images,
+        },
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "response_cache": env["RESPONSE_CACHE_BACKEND"],
+        "env": args.env,
+        "scenarios": scenarios,
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Benchmark query resolusi permission sebelum/sesudah composite key.
+
+Membuat dua skema terpisah (layout lama tanpa key, layout baru dengan
+composite primary key + reverse index), mengisi tabel asosiasi dengan
+jumlah baris yang sama, lalu mengukur:
+
+- forward: username -> permission (join users/user_roles/role_permissions)
+- reverse: role -> users dan permission -> roles
+
+Contoh:
+    python -m benchmarks.permission_query --rows 1000000
+    python -m benchmarks.permission_query \\
+        --before-url mysql+pymysql://u:p@localhost/bench_before \\
+        --after-url mysql+pymysql://u:p@localhost/bench_after
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    create_engine,
+    insert,
+    select,
+)
+
+BATCH_SIZE = 50_000
+
+
+def build_schema(keyed: bool):
+    metadata = MetaData()
+    users = Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("username", String(50), unique=True, nullable=False),
+    )
+    roles = Table(
+        "roles",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(50), unique=True),
+    )
+    permissions = Table(
+        "permissions",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String(100), unique=True),
+    )
+    extra = (
+        [Index("ix_user_roles_role_id_user_id", "role_id", "user_id")] if keyed else []
+    )
+    user_roles = Table(
+        "user_roles",
+        metadata,
+        Column("user_id", Integer, ForeignKey("users.id"), primary_key=keyed),
+        Column("role_id", Integer, ForeignKey("roles.id"), primary_key=keyed),
+        *extra,
+    )
+    extra = (
+        [Index("ix_role_permissions_permission_id_role_id", "permission_id", "role_id")]
+        if keyed
+        else []
+    )
+    role_permissions = Table(
+        "role_permissions",
+        metadata,
+        Column("role_id", Integer, ForeignKey("roles.id"), primary_key=keyed),
+        Column(
+            "permission_id", Integer, ForeignKey("permissions.id"), primary_key=keyed
+        ),
+        *extra,
+    )
+    return metadata, users, roles, permissions, user_roles, role_permissions
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(engine, tables, args):
+    metadata, users, roles, permissions, user_roles, role_permissions = tables
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    # Setiap user mendapat roles_per_user role acak (tanpa duplikat)
+    user_count = args.rows // args.roles_per_user
+    rng = random.Random(args.seed)
+
+    def user_role_rows():
+        for user_id in range(1, user_count + 1):
+            for role_id in rng.sample(range(1, args.roles + 1), args.roles_per_user):
+                yield {"user_id": user_id, "role_id": role_id}
+
+    with engine.begin() as conn:
+        for batch in _batched(
+            {"id": i, "username": f"user{i}"} for i in range(1, user_count + 1)
+        ):
+            conn.execute(insert(users), batch)
+        conn.execute(
+            insert(roles),
+            [{"id": i, "name": f"role{i}"} for i in range(1, args.roles + 1)],
+        )
+        conn.execute(
+            insert(permissions),
+            [{"id": i, "name": f"perm{i}"} for i in range(1, args.permissions + 1)],
+        )
+        conn.execute(
+            insert(role_permissions),
+            [
+                {"role_id": role_id, "permission_id": permission_id}
+                for role_id in range(1, args.roles + 1)
+                for permission_id in rng.sample(
+                    range(1, args.permissions + 1), args.permissions_per_role
+                )
+            ],
+        )
+        for batch in _batched(user_role_rows()):
+            conn.execute(insert(user_roles), batch)
+
+    return user_count
+
+
+def _timed(conn, statement, params, iterations):
+    samples = []
+    for value in params[:iterations]:
+        started = time.perf_counter()
+        conn.execute(statement, value).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "iterations": len(samples),
+        "p50_ms": round(statistics.median(samples), 4),
+        "p99_ms": round(samples[int(len(samples) * 0.99) - 1], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def run(url, keyed, args):
+    engine = create_engine(url)
+    tables = build_schema(keyed)
+    _, users, roles, permissions, user_roles, role_permissions = tables
+
+    started = time.perf_counter()
+    user_count = seed(engine, tables, args)
+    seed_seconds = time.perf_counter() - started
+
+    forward = (
+        select(permissions.c.name)
+        .distinct()
+        .select_from(users)
+        .join(user_roles, user_roles.c.user_id == users.c.id)
+        .join(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+        .join(permissions, permissions.c.id == role_permissions.c.permission_id)
+        .where(users.c.username == bindparam("username"))
+    )
+    role_users = select(user_roles.c.user_id).where(
+        user_roles.c.role_id == bindparam("role_id")
+    )
+    permission_roles = select(role_permissions.c.role_id).where(
+        role_permissions.c.permission_id == bindparam("permission_id")
+    )
+
+    rng = random.Random(args.seed + 1)
+    with engine.connect() as conn:
+        result = {
+            "layout": "composite_key" if keyed else "no_key",
+            "url": engine.url.render_as_string(hide_password=True),
+            "user_roles_rows": user_count * args.roles_per_user,
+            "seed_seconds": round(seed_seconds, 2),
+            "forward": _timed(
+                conn,
+                forward,
+                [
+                    {"username": f"user{rng.randint(1, user_count)}"}
+                    for _ in range(args.iterations)
+                ],
+                args.iterations,
+            ),
+            "reverse_role_users": _timed(
+                conn,
+                role_users,
+                [
+                    {"role_id": rng.randint(1, args.roles)}
+                    for _ in range(args.reverse_iterations)
+                ],
+                args.reverse_iterations,
+            ),
+            "reverse_permission_roles": _timed(
+                conn,
+                permission_roles,
+                [
+                    {"permission_id": rng.randint(1, args.permissions)}
+                    for _ in range(args.iterations)
+                ],
+                args.iterations,
+            ),
+        }
+    engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--roles-per-user", type=int, default=2)
+    parser.add_argument("--permissions", type=int, default=500)
+    parser.add_argument("--permissions-per-role", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--reverse-iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--before-url", default=None)
+    parser.add_argument("--after-url", default=None)
+    args = parser.parse_args()
+
+    # Default: dua file SQLite sementara supaya tidak menyentuh DB aplikasi
+    workdir = tempfile.mkdtemp(prefix="permission_bench_")
+    before_url = args.before_url or f"sqlite:///{os.path.join(workdir, 'before.db')}"
+    after_url = args.after_url or f"sqlite:///{os.path.join(workdir, 'after.db')}"
+
+    print(
+        json.dumps([run(before_url, False, args), run(after_url, True, args)], indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
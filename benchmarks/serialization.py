@@ -0,0 +1,83 @@
+"""Micro-benchmark serialisasi response daftar buku.
+
+Membandingkan jalur lama (objek Pydantic -> jsonable_encoder -> json.dumps)
+dengan jalur baru (dict -> TypeAdapter.dump_json di pydantic-core), serta
+orjson untuk konten dict biasa seperti error handler dan NDJSON.
+
+Contoh:
+    python -m benchmarks.serialization --rows 100
+"""
+
+import argparse
+import json
+import timeit
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.helpers.http_cache import render_json
+from app.schemas.book import PaginatedBooks, ShowBookResponse
+
+
+def per_call_us(func, iterations: int, repeat: int) -> float:
+    best = min(timeit.repeat(func, number=iterations, repeat=repeat))
+    return round(best / iterations * 1_000_000, 3)
+
+
+def make_rows(count: int):
+    return [
+        {
+            "id": i,
+            "title": f"Buku {i}",
+            "author": f"Penulis {i % 50}",
+            "description": "Deskripsi singkat buku " * 4,
+            "picture": f"http://localhost/uploads/book-{i}-320.webp",
+            "status": "ready",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    meta = {"total": 1000, "page": 1, "per_page": args.rows, "total_pages": 10}
+
+    def before():
+        data = [ShowBookResponse(**row) for row in rows]
+        return JSONResponse(jsonable_encoder({"data": data, "meta": meta})).body
+
+    def after():
+        return render_json(PaginatedBooks, {"data": rows, "meta": meta})
+
+    results = {
+        "jsonable_encoder": per_call_us(before, args.iterations, args.repeat),
+        "pydantic_dump_json": per_call_us(after, args.iterations, args.repeat),
+        "json_dumps_dict": per_call_us(
+            lambda: json.dumps({"data": rows, "meta": meta}).encode(),
+            args.iterations,
+            args.repeat,
+        ),
+        "orjson_dumps_dict": per_call_us(
+            lambda: orjson.dumps({"data": rows, "meta": meta}),
+            args.iterations,
+            args.repeat,
+        ),
+    }
+
+    print(
+        json.dumps(
+            {"rows": args.rows, "bytes": len(after()), "us_per_response": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import statistics
+import time
+
+from passlib.hash import argon2, bcrypt
+
+SAMPLE_PASSWORD = "calibration-password"
+
+
+def measure(handler, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int):
+    # Cari rounds tertinggi yang masih di bawah target latency
+    best = None
+    for rounds in range(10, 17):
+        elapsed = measure(bcrypt.using(rounds=rounds), samples)
+        print(f"bcrypt rounds={rounds}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    # 10 adalah batas bawah walaupun host lebih lambat dari target
+    return {"BCRYPT_ROUNDS": best or 10}
+
+
+def calibrate_argon2(
+    target_ms: float, samples: int, memory_cost: int, parallelism: int
+):
+    # Memory tetap, naikkan time_cost sampai melewati target latency
+    best = None
+    for time_cost in range(1, 11):
+        handler = argon2.using(
+            type="ID",
+            memory_cost=memory_cost,
+            time_cost=time_cost,
+            parallelism=parallelism,
+        )
+        elapsed = measure(handler, samples)
+        print(
+            f"argon2id m={memory_cost} t={time_cost} p={parallelism}: {elapsed:.1f} ms"
+        )
+        if elapsed > target_ms:
+            break
+        best = time_cost
+    return {
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_TIME_COST": best or 1,
+        "ARGON2_PARALLELISM": parallelism,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ukur waktu hash password di host ini dan pilih cost sesuai target latency"
+    )
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--memory-cost", type=int, default=65536, help="KiB, argon2")
+    parser.add_argument("--parallelism", type=int, default=4, help="argon2")
+    args = parser.parse_args()
+
+    if args.scheme == "bcrypt":
+        result = calibrate_bcrypt(args.target_ms, args.samples)
+    else:
+        result = calibrate_argon2(
+            args.target_ms, args.samples, args.memory_cost, args.parallelism
+        )
+
+    print("\n# Tambahkan ke .env")
+    # bcrypt tetap didaftarkan agar hash lama masih bisa diverifikasi lalu di-rehash
+    schemes = ["argon2", "bcrypt"] if args.scheme == "argon2" else ["bcrypt"]
+    print("PASSWORD_SCHEMES=" + json.dumps(schemes))
+    for key, value in result.items():
+        print(f"{key}={value}")
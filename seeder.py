@@ -1,48 +1,227 @@
-from app.database import SessionLocal
-from app.models.role import Role, Permission
+import argparse
+import io
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from sqlalchemy import Integer, cast, func, insert, select
+from app.core.config import settings
+from app.database import Base, SessionLocal, engine
+from app.models.book import Book
+from app.models.role import Role, Permission, role_permissions, user_roles
 from app.models.user import User
 from app.utils.hash import hash_password
 
+PERMISSIONS = ("custom_book", "custom_role_permission", "custom_user")
+PASSWORD = "password"
+# hash berbeda (salt berbeda) untuk password yang sama, dibagi ke semua user
+PASSWORD_POOL_SIZE = 32
+BATCH_SIZE = 10_000
 
-def seed():
+
+def _cover(index: int) -> bytes:
+    # cover sintetis: warna berbeda per buku supaya hash konten unik
+    rng = random.Random(index)
+    color = tuple(rng.randrange(256) for _ in range(3))
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 900), color).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def store_cover(index: int) -> str:
+    # dijalankan di process pool, lewat jalur yang sama dengan upload:
+    # stage_file memberi nama dari hash konten, lalu diproses jadi jpeg + derivative
+    from app.services import image_service
+
+    filename = image_service.stage_file(io.BytesIO(_cover(index)))
+    image_service.process_picture(
+        image_service.staging_path(filename),
+        os.path.join(image_service.UPLOAD_DIR, filename),
+        settings.BOOK_PICTURE_SIZES,
+        image_service.picture_formats(),
+        settings.MAX_IMAGE_PIXELS,
+        settings.MAX_PICTURE_DIMENSION,
+    )
+    return filename
+
+
+def _last_index(db, column, prefix: str) -> int:
+    # baris hasil generate dinamai berurutan dan di-commit per batch, jadi
+    # suffix angka terbesar = indeks terakhir yang tersimpan (tidak terpengaruh
+    # baris lain berawalan sama atau baris yang sudah di-purge)
+    suffix = cast(func.substr(column, len(prefix) + 1), Integer)
+    return db.scalar(select(func.max(suffix)).where(column.like(f"{prefix}%"))) or 0
+
+
+def _next_id(db, model) -> int:
+    return (db.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _progress(label: str, done: int, total: int, started: float):
+    rate = done / max(time.perf_counter() - started, 1e-9)
+    print(f"  {label}: {done}/{total} ({rate:,.0f}/s)", flush=True)
+
+
+def seed_roles(db, roles: int):
+    """Role "Role N" dengan subset permission acak."""
+    done = _last_index(db, Role.name, "Role ")
+    if done >= roles:
+        return
+    rng = random.Random(f"roles-{done}")
+    permission_ids = db.scalars(select(Permission.id)).all()
+    role_id = _next_id(db, Role)
+    role_rows, permission_rows = [], []
+    for i in range(done + 1, roles + 1):
+        role_rows.append({"id": role_id, "name": f"Role {i}"})
+        count = rng.randint(1, len(permission_ids))
+        for permission_id in rng.sample(permission_ids, count):
+            permission_rows.append({"role_id": role_id, "permission_id": permission_id})
+        role_id += 1
+    db.execute(insert(Role), role_rows)
+    db.execute(insert(role_permissions), permission_rows)
+    db.commit()
+    print(f"  roles: {roles}/{roles}", flush=True)
+
+
+def seed_users(db, users: int, batch_size: int):
+    """User "userN" / "userN@example.com", password "password".
+
+    Tiap user mendapat 1-3 role, popularitas role mengikuti distribusi zipf
+    (sedikit role dipakai banyak user) seperti data nyata.
+    """
+    done = _last_index(db, User.username, "user")
+    if done >= users:
+        return
+    role_ids = db.scalars(
+        select(Role.id).where(Role.name.like("Role %")).order_by(Role.id)
+    ).all()
+    weights = [1 / rank for rank in range(1, len(role_ids) + 1)]
+    # bcrypt hanya dijalankan PASSWORD_POOL_SIZE kali, bukan sekali per user
+    pool = [hash_password(PASSWORD) for _ in range(PASSWORD_POOL_SIZE)]
+
+    started = time.perf_counter()
+    user_id = _next_id(db, User)
+    for start in range(done + 1, users + 1, batch_size):
+        # rng per batch, supaya run yang dilanjutkan menghasilkan data yang sama
+        rng = random.Random(f"users-{start}")
+        user_rows, role_rows = [], []
+        for i in range(start, min(start + batch_size, users + 1)):
+            user_rows.append(
+                {
+                    "id": user_id,
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "password": pool[i % PASSWORD_POOL_SIZE],
+                }
+            )
+            if role_ids:
+                count = rng.choice((1, 1, 1, 2, 2, 3))
+                for role_id in set(rng.choices(role_ids, weights, k=count)):
+                    role_rows.append({"user_id": user_id, "role_id": role_id})
+            user_id += 1
+        db.execute(insert(User), user_rows)
+        if role_rows:
+            db.execute(insert(user_roles), role_rows)
+        db.commit()
+        _progress("users", i, users, started)
+
+
+def seed_books(db, books: int, images: int, batch_size: int, workers: int):
+    """Buku "Book N"; `images` buku pertama diberi cover sintetis.
+
+    Cover satu batch dibuat paralel di process pool tepat sebelum batch itu
+    di-insert, jadi run yang terhenti paling banyak meninggalkan cover satu batch.
+    """
+    done = _last_index(db, Book.title, "Book ")
+    if done >= books:
+        return
+    authors = max(1, books // 10)
+    started = time.perf_counter()
+    book_id = _next_id(db, Book)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        for start in range(done + 1, books + 1, batch_size):
+            rng = random.Random(f"books-{start}")
+            stop = min(start + batch_size, books + 1)
+            indexes = range(start, min(stop, images + 1))
+            covers = dict(zip(indexes, pool.map(store_cover, indexes, chunksize=16)))
+            rows = []
+            for i in range(start, stop):
+                rows.append(
+                    {
+                        "id": book_id,
+                        "title": f"Book {i}",
+                        "author": f"Author {rng.randint(1, authors)}",
+                        "description": f"Deskripsi buku nomor {i}",
+                        "picture": covers.get(i, ""),
+                        "status": "ready",
+                    }
+                )
+                book_id += 1
+            db.execute(insert(Book), rows)
+            db.commit()
+            _progress("books", i, books, started)
+
+
+def seed_fixtures(
+    db,
+    users: int = 0,
+    roles: int = 0,
+    books: int = 0,
+    images: int = 0,
+    batch_size: int = BATCH_SIZE,
+    workers: int = None,
+):
+    """Data tambahan untuk benchmark/load test, aman dijalankan ulang.
+
+    Insert memakai Core executemany per batch (satu transaksi per batch),
+    jadi run yang terhenti cukup dijalankan ulang dengan argumen yang sama
+    untuk melanjutkan dari batch terakhir yang sudah di-commit.
+    """
+    seed_roles(db, roles)
+    seed_users(db, users, batch_size)
+    seed_books(db, books, images, batch_size, workers or os.cpu_count())
+
+
+def seed(users: int = 0, roles: int = 0, books: int = 0, images: int = 0, **options):
     db = SessionLocal()
     try:
 
-        # Permissions
-        permission_book = Permission(name="custom_book")
-        permission_role_permission = Permission(name="custom_role_permission")
-        permission_user = Permission(name="custom_user")
+        # Permissions (yang sudah ada dipakai ulang, seeder boleh dijalankan ulang)
+        existing = {permission.name: permission for permission in db.query(Permission)}
+        permissions = [
+            existing.get(name) or Permission(name=name) for name in PERMISSIONS
+        ]
 
         # Roles
-        admin = Role(name="Admin")
+        admin = db.query(Role).filter(Role.name == "Admin").first()
+        if admin is None:
+            admin = Role(name="Admin")
 
         # User
-        data_user = User(
-            username="admin",
-            email="admin@example.com",
-            password=hash_password("password"),
-        )
+        data_user = db.query(User).filter(User.username == "admin").first()
+        if data_user is None:
+            data_user = User(
+                username="admin",
+                email="admin@example.com",
+                password=hash_password(PASSWORD),
+            )
         # Assign permissions
-        admin.permissions = [
-            permission_book,
-            permission_role_permission,
-            permission_user,
-        ]
+        admin.permissions = permissions
 
         # Assign roles
-        data_user.roles = [admin]
+        if admin not in data_user.roles:
+            data_user.roles.append(admin)
 
         # Commit ke DB
-        db.add_all(
-            [
-                admin,
-                data_user,
-                permission_book,
-                permission_role_permission,
-                permission_user,
-            ]
-        )
+        db.add_all([admin, data_user, *permissions])
         db.commit()
+
+        if users or roles or books:
+            seed_fixtures(db, users, roles, books, images, **options)
         print("Seeding done!")
     except Exception as e:
         db.rollback()
@@ -52,4 +231,38 @@ def seed():
 
 
 if __name__ == "__main__":
-    seed()
+    parser = argparse.ArgumentParser(description="Isi database dengan data awal")
+    parser.add_argument("--users", type=int, default=0, help="Jumlah user tambahan")
+    parser.add_argument("--roles", type=int, default=0, help="Jumlah role tambahan")
+    parser.add_argument("--books", type=int, default=0, help="Jumlah buku")
+    parser.add_argument(
+        "--images", type=int, default=0, help="Jumlah buku yang diberi cover"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BATCH_SIZE, help="Baris per transaksi"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Jumlah proses pembuat cover"
+    )
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="Buat tabel langsung dari model (database kosong tanpa alembic)",
+    )
+    args = parser.parse_args()
+
+    if args.create_schema:
+        import app.models.cache  # noqa: F401 (daftarkan tabel cache_generations)
+        import app.models.token  # noqa: F401 (daftarkan tabel revoked_tokens)
+
+        Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    seed(
+        args.users,
+        args.roles,
+        args.books,
+        args.images,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    print(f"Selesai dalam {time.perf_counter() - started:.1f}s")
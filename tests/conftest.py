@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="fastapi-test-"), "test.db")
+
+# Settings dibaca saat import app, jadi env harus diisi sebelum import apa pun
+os.environ.update(
+    {
+        "DB_USER": "test",
+        "DB_PASSWORD": "test",
+        "DB_HOST": "localhost",
+        "DB_PORT": "3306",
+        "DB_NAME": "test",
+        "JWT_SECRET": "test-secret",
+        "JWT_ALGORITHM": "HS256",
+        "DATABASE_URL": f"sqlite:///{DB_PATH}",
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{DB_PATH}",
+        "DB_ASYNC": "false",
+    }
+)
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    import app.models.book  # noqa: F401
+    import app.models.cache  # noqa: F401
+    import app.models.token  # noqa: F401
+    import seeder
+    from app.database import Base, engine
+
+    Base.metadata.create_all(engine)
+    seeder.seed()
+    return engine
+
+
+@pytest.fixture()
+def client(engine):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    # tanpa `with`: lifespan (task sync/purge di background) tidak dijalankan
+    return TestClient(app)
+
+
+@pytest.fixture()
+def admin_headers():
+    from app.core.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'admin'})}"}
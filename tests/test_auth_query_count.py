@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core import permission_cache
+from app.core.security import create_access_token
+from app.database import SessionLocal
+from app.models.role import Permission, Role
+from app.models.user import User
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(scope="module")
+def multi_role_headers(engine):
+    # beberapa role: loop per role (N+1) akan menambah query per role
+    db = SessionLocal()
+    try:
+        permissions = db.query(Permission).all()
+        roles = [
+            Role(name=f"Query Count {i}", permissions=[permission])
+            for i, permission in enumerate(permissions)
+        ]
+        db.add(
+            User(
+                username="querycount",
+                email="querycount@example.com",
+                password="x",
+                roles=roles,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+    token = create_access_token({"sub": "querycount"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(autouse=True)
+def cold_cache():
+    permission_cache.clear()
+    yield
+    permission_cache.clear()
+
+
+def test_cold_cache_authenticates_with_one_query(engine, client, multi_role_headers):
+    with count_statements(engine) as statements:
+        response = client.get("/auth/profile", headers=multi_role_headers)
+
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+
+
+def test_warm_cache_authenticates_without_queries(engine, client, multi_role_headers):
+    client.get("/auth/profile", headers=multi_role_headers)
+
+    with count_statements(engine) as statements:
+        response = client.get("/auth/profile", headers=multi_role_headers)
+
+    assert response.status_code == 200
+    assert statements == []
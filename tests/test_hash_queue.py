@@ -0,0 +1,31 @@
+import pytest
+
+from app.core.config import settings
+from app.services import hash_service
+
+
+@pytest.fixture()
+def full_hash_queue():
+    for _ in range(settings.HASH_QUEUE_SIZE):
+        assert hash_service._slots.acquire(blocking=False)
+    yield
+    for _ in range(settings.HASH_QUEUE_SIZE):
+        hash_service._slots.release()
+
+
+def test_login_rejected_with_retry_after_when_queue_is_full(
+    engine, client, full_hash_queue
+):
+    response = client.post(
+        "/auth/login", json={"username": "admin", "password": "password"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_unauthorized_keeps_www_authenticate(engine, client):
+    response = client.get("/auth/profile", headers={"Authorization": "Bearer invalid"})
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
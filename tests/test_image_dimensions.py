@@ -0,0 +1,44 @@
+import struct
+import zlib
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import image_service
+
+
+def png_header(width: int, height: int) -> bytes:
+    # hanya header PNG: Image.open membaca ukuran tanpa decode pixel
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(kind + data)
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IEND", b"")
+
+
+@pytest.mark.parametrize(
+    "width, height",
+    [
+        (8000, 6000),  # di atas MAX_IMAGE_PIXELS
+        (20000, 20000),  # di atas 2x batas Pillow (DecompressionBombError)
+    ],
+)
+def test_oversized_dimensions_are_rejected_with_413(tmp_path, width, height):
+    path = tmp_path / "picture.png"
+    path.write_bytes(png_header(width, height))
+
+    with pytest.raises(HTTPException) as error:
+        image_service.check_dimensions(str(path))
+
+    assert error.value.status_code == 413
+
+
+def test_corrupt_image_is_rejected_with_400(tmp_path):
+    path = tmp_path / "picture.png"
+    path.write_bytes(b"\x89PNG\r\n\x1a\nnot an image")
+
+    with pytest.raises(HTTPException) as error:
+        image_service.check_dimensions(str(path))
+
+    assert error.value.status_code == 400